@@ -0,0 +1,113 @@
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class ApiTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='MikeyMouse', first_name='Mikey', last_name='Mouse')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='mouses',
+            description='Тестовое описание группы',
+        )
+        for number in range(5):
+            Post.objects.create(
+                author=cls.user,
+                group=cls.group if number % 2 else None,
+                text=f'Пост {number}',
+            )
+        cls.ordered = list(Post.objects.order_by('-pub_date', '-id'))
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def test_post_list_is_one_query(self):
+        """Страница постов с автором и группой — один запрос к базе."""
+        with self.assertNumQueries(1):
+            response = self.guest_client.get(reverse('api:post_list'))
+        results = response.json()['results']
+        self.assertEqual(
+            [row['id'] for row in results],
+            [post.id for post in self.ordered])
+        self.assertEqual(results[0]['author'], self.user.username)
+
+    def test_cursor_pages(self):
+        """next и previous ведут на соседние страницы."""
+        url = reverse('api:post_list')
+        first = self.guest_client.get(url, {'limit': 2}).json()
+        self.assertIsNone(first['previous'])
+        second = self.guest_client.get(first['next']).json()
+        self.assertEqual(
+            [row['id'] for row in second['results']],
+            [post.id for post in self.ordered[2:4]])
+        back = self.guest_client.get(second['previous']).json()
+        self.assertEqual(back['results'], first['results'])
+
+    def test_group_list_pages(self):
+        """Список групп отдаётся страницами по slug."""
+        for slug in ('cats', 'dogs'):
+            Group.objects.create(title=slug, slug=slug)
+        url = reverse('api:group_list')
+        with self.assertNumQueries(1):
+            first = self.guest_client.get(url, {'limit': 2}).json()
+        self.assertEqual(
+            [row['slug'] for row in first['results']], ['cats', 'dogs'])
+        second = self.guest_client.get(first['next']).json()
+        self.assertEqual(
+            [row['slug'] for row in second['results']], ['mouses'])
+        self.assertIsNone(second['next'])
+
+    def test_fields_selection(self):
+        """?fields= отдаёт только запрошенные поля."""
+        response = self.guest_client.get(
+            reverse('api:post_list'), {'fields': 'id,group'})
+        self.assertEqual(
+            set(response.json()['results'][0]), {'id', 'group'})
+        response = self.guest_client.get(
+            reverse('api:post_list'), {'fields': 'id,password'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_scoped_lists(self):
+        """Посты группы и автора фильтруются по своей ленте."""
+        response = self.guest_client.get(
+            reverse('api:group_posts', kwargs={'slug': self.group.slug}))
+        self.assertEqual(len(response.json()['results']), 2)
+        response = self.guest_client.get(
+            reverse('api:author_posts',
+                    kwargs={'username': self.user.username}))
+        self.assertEqual(len(response.json()['results']), 5)
+
+    def test_details(self):
+        post = self.ordered[0]
+        response = self.guest_client.get(
+            reverse('api:post_detail', kwargs={'post_id': post.id}))
+        self.assertEqual(response.json()['text'], post.text)
+        response = self.guest_client.get(
+            reverse('api:group_detail', kwargs={'slug': self.group.slug}))
+        self.assertEqual(response.json()['title'], self.group.title)
+        response = self.guest_client.get(
+            reverse('api:author_detail',
+                    kwargs={'username': self.user.username}))
+        self.assertEqual(response.json()['posts_count'], 5)
+        response = self.guest_client.get(reverse('api:group_list'))
+        self.assertEqual(len(response.json()['results']), 1)
+
+    def test_not_found(self):
+        urls = (
+            reverse('api:post_detail', kwargs={'post_id': 10 ** 6}),
+            reverse('api:group_posts', kwargs={'slug': 'no-such-group'}),
+            reverse('api:author_detail', kwargs={'username': 'nobody'}),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertEqual(response.status_code, 404)
+                self.assertIn('detail', response.json())
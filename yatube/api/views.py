@@ -0,0 +1,176 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models.functions import Coalesce
+from django.http import JsonResponse
+from django.views.decorators.http import require_safe
+
+from posts.models import Group, Post, User
+from posts.paginators import CursorPaginator
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+# Поле ответа -> путь в ORM. Автор и группа подтягиваются JOIN'ом
+# того же запроса, только если клиент их запросил.
+POST_FIELDS = {
+    'id': 'id',
+    'text': 'text',
+    'text_html': 'text_html',
+    'pub_date': 'pub_date',
+    'updated': 'updated',
+    'author': 'author__username',
+    'author_first_name': 'author__first_name',
+    'author_last_name': 'author__last_name',
+    'group': 'group__slug',
+    'group_title': 'group__title',
+}
+GROUP_FIELDS = ('id', 'slug', 'title', 'description')
+AUTHOR_FIELDS = ('username', 'first_name', 'last_name', 'posts_count')
+
+
+class BadRequest(Exception):
+    pass
+
+
+def json_response(data, status=200):
+    return JsonResponse(
+        data, status=status, encoder=DjangoJSONEncoder,
+        json_dumps_params={'ensure_ascii': False},
+    )
+
+
+def not_found():
+    return json_response({'detail': 'Не найдено.'}, status=404)
+
+
+def requested_fields(request):
+    """Поля поста из ?fields=id,text,...; по умолчанию все."""
+    fields = request.GET.get('fields')
+    if not fields:
+        return list(POST_FIELDS)
+    fields = [field.strip() for field in fields.split(',') if field.strip()]
+    unknown = set(fields) - set(POST_FIELDS)
+    if unknown:
+        raise BadRequest(
+            'Неизвестные поля: {}'.format(', '.join(sorted(unknown))))
+    return fields
+
+
+def requested_limit(request):
+    try:
+        limit = int(request.GET.get('limit', DEFAULT_LIMIT))
+    except ValueError:
+        raise BadRequest('limit должен быть целым числом')
+    return min(max(limit, 1), MAX_LIMIT)
+
+
+def serialize_post(row, fields):
+    return {field: row[POST_FIELDS[field]] for field in fields}
+
+
+def page_url(request, **cursor):
+    query = request.GET.copy()
+    query.pop('after', None)
+    query.pop('before', None)
+    query.update(cursor)
+    return request.build_absolute_uri(f'?{query.urlencode()}')
+
+
+def post_page(request, queryset):
+    """Страница постов по курсору одним запросом к базе.
+
+    Выбираются только запрошенные поля через values(), а id и
+    pub_date — всегда, потому что из них строится курсор.
+    """
+    try:
+        fields = requested_fields(request)
+        limit = requested_limit(request)
+    except BadRequest as error:
+        return json_response({'detail': str(error)}, status=400)
+    paths = {'id', 'pub_date'} | {POST_FIELDS[field] for field in fields}
+    paginator = CursorPaginator(queryset.values(*paths), limit)
+    page = paginator.get_cursor_page(
+        after=request.GET.get('after'), before=request.GET.get('before'))
+    return json_response({
+        'results': [serialize_post(row, fields) for row in page],
+        'next': page.next_cursor and page_url(
+            request, after=page.next_cursor),
+        'previous': page.previous_cursor and page_url(
+            request, before=page.previous_cursor),
+    })
+
+
+@require_safe
+def post_list(request):
+    return post_page(request, Post.objects.all())
+
+
+@require_safe
+def group_posts(request, slug):
+    group_id = Group.objects.filter(slug=slug).values_list(
+        'id', flat=True).first()
+    if group_id is None:
+        return not_found()
+    return post_page(request, Post.objects.filter(group_id=group_id))
+
+
+@require_safe
+def author_posts(request, username):
+    author_id = User.objects.filter(username=username).values_list(
+        'id', flat=True).first()
+    if author_id is None:
+        return not_found()
+    return post_page(request, Post.objects.filter(author_id=author_id))
+
+
+@require_safe
+def post_detail(request, post_id):
+    try:
+        fields = requested_fields(request)
+    except BadRequest as error:
+        return json_response({'detail': str(error)}, status=400)
+    row = Post.objects.filter(pk=post_id).values(
+        *{POST_FIELDS[field] for field in fields}).first()
+    if row is None:
+        return not_found()
+    return json_response(serialize_post(row, fields))
+
+
+@require_safe
+def group_list(request):
+    """Группы по возрастанию slug, страницами по ключу ?after=<slug>.
+
+    Групп могут быть десятки тысяч, поэтому список, как и посты,
+    отдаётся по limit записей без OFFSET и COUNT(*).
+    """
+    try:
+        limit = requested_limit(request)
+    except BadRequest as error:
+        return json_response({'detail': str(error)}, status=400)
+    groups = Group.objects.order_by('slug').values(*GROUP_FIELDS)
+    after = request.GET.get('after')
+    if after:
+        groups = groups.filter(slug__gt=after)
+    rows = list(groups[:limit + 1])
+    return json_response({
+        'results': rows[:limit],
+        'next': page_url(request, after=rows[limit - 1]['slug'])
+        if len(rows) > limit else None,
+    })
+
+
+@require_safe
+def group_detail(request, slug):
+    row = Group.objects.filter(slug=slug).values(*GROUP_FIELDS).first()
+    if row is None:
+        return not_found()
+    return json_response(row)
+
+
+@require_safe
+def author_detail(request, username):
+    row = User.objects.filter(username=username).annotate(
+        posts_count=Coalesce('post_stats__posts_count', 0),
+    ).values(*AUTHOR_FIELDS).first()
+    if row is None:
+        return not_found()
+    return json_response(row)
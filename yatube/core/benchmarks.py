@@ -0,0 +1,67 @@
+import math
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache
+from django.core.management.base import CommandError
+from django.test.utils import override_settings
+
+from posts.models import Post
+
+BENCH_CACHE = 'bench'
+
+
+def percentile(values, share):
+    """Перцентиль по методу ближайшего ранга (share от 0 до 100)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(math.ceil(share / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def summarize(timings_ms):
+    """p50/p95/p99 и среднее для списка замеров в миллисекундах."""
+    return {
+        'p50_ms': round(percentile(timings_ms, 50), 3),
+        'p95_ms': round(percentile(timings_ms, 95), 3),
+        'p99_ms': round(percentile(timings_ms, 99), 3),
+        'mean_ms': round(sum(timings_ms) / len(timings_ms), 3)
+        if timings_ms else 0.0,
+    }
+
+
+def bench_host():
+    """Хост из ALLOWED_HOSTS, с которым тестовый клиент пройдёт проверку."""
+    return next(
+        (host for host in settings.ALLOWED_HOSTS if host != '*'),
+        'localhost',
+    ).lstrip('.')
+
+
+def sample_post():
+    """Пост с группой и автором, на страницах которого идут замеры."""
+    post = Post.objects.select_related('author', 'group').filter(
+        group__isnull=False).first()
+    if post is None:
+        raise CommandError(
+            'Нет постов с группой: сначала выполните generate_dataset.')
+    return post
+
+
+@contextmanager
+def bench_cache():
+    """Подменяет кеш по умолчанию отдельным кешем замеров и очищает его.
+
+    Команды сбрасывают кеш между прогонами; cache.clear() на общем
+    кеше стёр бы страницы, версии карточек и счётчики лент сайта.
+    """
+    config = settings.CACHES.get(BENCH_CACHE)
+    if config is None or config == settings.CACHES[DEFAULT_CACHE_ALIAS]:
+        raise CommandError(
+            f'Нужен отдельный кеш CACHES[{BENCH_CACHE!r}], не совпадающий '
+            'с кешем сайта.')
+    with override_settings(CACHES={**settings.CACHES,
+                                   DEFAULT_CACHE_ALIAS: config}):
+        cache.clear()
+        yield cache
@@ -0,0 +1,94 @@
+import zlib
+
+try:
+    import brotli
+except ImportError:  # brotli — необязательная зависимость
+    brotli = None
+
+COMPRESSIBLE_TYPES = frozenset((
+    'text/html', 'text/css', 'text/plain', 'text/csv', 'text/xml',
+    'text/javascript', 'application/javascript', 'application/json',
+    'application/xml', 'application/rss+xml', 'application/atom+xml',
+    'application/x-ndjson', 'image/svg+xml',
+))
+
+# Потоковый ответ сбрасывается клиенту не после каждого куска, а после
+# стольких байт исходных данных: экспорт отдаёт строки по одной, и
+# сброс на каждой строке почти сводит сжатие на нет.
+STREAM_FLUSH_BYTES = 16 * 1024
+
+
+class GzipEncoder:
+    name = 'gzip'
+    suffix = '.gz'
+    levels = range(1, 10)
+
+    def __init__(self, level=6):
+        self.level = level
+
+    def compress(self, data):
+        # gzip.compress принимает mtime только с Python 3.8, а zlib
+        # с gzip-заголовком и так пишет нулевое время: копии побайтно
+        # совпадают между сборками.
+        compressor = self.compressor()
+        return compressor.compress(data) + compressor.flush()
+
+    def compressor(self):
+        return zlib.compressobj(
+            self.level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def stream(self, chunks):
+        compressor = self.compressor()
+        pending = 0
+        for chunk in chunks:
+            data = compressor.compress(chunk)
+            pending += len(chunk)
+            if pending >= STREAM_FLUSH_BYTES:
+                data += compressor.flush(zlib.Z_SYNC_FLUSH)
+                pending = 0
+            if data:
+                yield data
+        yield compressor.flush()
+
+
+class BrotliEncoder:
+    name = 'br'
+    suffix = '.br'
+    levels = range(0, 12)
+
+    def __init__(self, level=4):
+        self.level = level
+
+    def compress(self, data):
+        return brotli.compress(data, quality=self.level)
+
+    def stream(self, chunks):
+        compressor = brotli.Compressor(quality=self.level)
+        pending = 0
+        for chunk in chunks:
+            data = compressor.process(chunk)
+            pending += len(chunk)
+            if pending >= STREAM_FLUSH_BYTES:
+                data += compressor.flush()
+                pending = 0
+            if data:
+                yield data
+        yield compressor.finish()
+
+
+def available_encoders(gzip_level=6, brotli_level=4):
+    """Кодировки в порядке предпочтения: brotli, если установлен, и gzip."""
+    encoders = [GzipEncoder(gzip_level)]
+    if brotli is not None:
+        encoders.insert(0, BrotliEncoder(brotli_level))
+    return encoders
+
+
+def accepted_encodings(request):
+    """Кодировки из Accept-Encoding, кроме явно запрещённых через q=0."""
+    encodings = set()
+    for item in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        name, _, params = item.strip().partition(';')
+        if params.replace(' ', '') not in ('q=0', 'q=0.0', 'q=0.00'):
+            encodings.add(name.strip().lower())
+    return encodings
@@ -0,0 +1,29 @@
+from functools import lru_cache
+
+from django.urls import get_script_prefix, reverse
+
+NAV_URLS = {
+    'index': 'posts:index',
+    'post_create': 'posts:post_create',
+    'group_index': 'posts:group_index',
+    'about_author': 'about:author',
+    'about_tech': 'about:tech',
+    'password_change': 'users:password_change',
+    'logout': 'users:logout',
+    'login': 'users:login',
+    'signup': 'users:signup',
+}
+
+
+@lru_cache(maxsize=None)
+def _reverse_nav_urls(script_prefix):
+    return {key: reverse(name) for key, name in NAV_URLS.items()}
+
+
+def navigation(request):
+    """Адреса шапки сайта, вычисленные один раз на процесс.
+
+    Они не зависят от запроса, а reverse() для каждой ссылки
+    в каждом рендере шапки заметно дороже словаря.
+    """
+    return {'nav_urls': _reverse_nav_urls(get_script_prefix())}
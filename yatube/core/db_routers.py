@@ -0,0 +1,95 @@
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Приложения, чтение которых всегда идёт с основной базы: сессия
+# и пользователь должны быть видны сразу после входа.
+PRIMARY_APPS = frozenset(('auth', 'sessions', 'contenttypes', 'admin'))
+
+reads_from_replica = ContextVar('reads_from_replica', default=False)
+
+
+@contextmanager
+def replica_reads():
+    """Разрешает читать с реплик внутри блока.
+
+    По умолчанию всё, включая команды управления и фоновые задачи,
+    работает с основной базой; реплики включает только
+    ReplicaRoutingMiddleware для запросов, которые ничего не пишут.
+    """
+    token = reads_from_replica.set(True)
+    try:
+        yield
+    finally:
+        reads_from_replica.reset(token)
+
+
+@contextmanager
+def primary_reads():
+    """Читает с основной базы внутри блока, даже если запрос
+    обслуживается репликами.
+    """
+    token = reads_from_replica.set(False)
+    try:
+        yield
+    finally:
+        reads_from_replica.reset(token)
+
+
+def replica_may_lag(changed_at):
+    """Могли ли данные, изменённые в момент ``changed_at`` (timestamp),
+    ещё не дойти до реплики, с которой читает текущий запрос.
+
+    Отставание реплик считается не больше REPLICA_PIN_SECONDS — на
+    это же время запросы автора записи закрепляются за основной
+    базой. Прочитанное с реплики в этом окне нельзя класть в кеш
+    под новой версией: старые данные остались бы там до следующей
+    записи.
+    """
+    if not reads_from_replica.get() or not replica_aliases():
+        return False
+    lag = getattr(settings, 'REPLICA_PIN_SECONDS', 5)
+    return time.time() - changed_at < lag
+
+
+def replica_aliases():
+    """Реплики из settings.REPLICA_DATABASES, кроме зеркал основной базы.
+
+    В тестах реплика с TEST MIRROR указывает на ту же базу, что и
+    default; читать из неё через отдельное соединение бессмысленно,
+    а внутри транзакции TestCase ещё и не видно несохранённых данных.
+    """
+    primary = connections[DEFAULT_DB_ALIAS].settings_dict['NAME']
+    return [
+        alias for alias in getattr(settings, 'REPLICA_DATABASES', ())
+        if connections[alias].settings_dict['NAME'] != primary
+    ]
+
+
+class PrimaryReplicaRouter:
+    """Запись — в основную базу, чтение лент — с реплик.
+
+    Реплики перечислены в settings.REPLICA_DATABASES; если список
+    пуст, всё идёт в основную базу.
+    """
+
+    def db_for_read(self, model, **hints):
+        if (not reads_from_replica.get()
+                or model._meta.app_label in PRIMARY_APPS):
+            return DEFAULT_DB_ALIAS
+        replicas = replica_aliases()
+        return random.choice(replicas) if replicas else DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики — копии основной базы, объекты из них совместимы.
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        return db == DEFAULT_DB_ALIAS
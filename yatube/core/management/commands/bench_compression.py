@@ -0,0 +1,78 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.urls import reverse
+
+from core.benchmarks import bench_cache, bench_host, sample_post, summarize
+from core.compression import BrotliEncoder, GzipEncoder, brotli
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает уровни gzip и brotli на реальных ответах (лента, '
+        'группа, пост, RSS, API, CSV-экспорт): время сжатия и '
+        'итоговый размер относительно исходного.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repeat', type=int, default=20,
+            help='Сколько раз сжимать каждый ответ на каждом уровне',
+        )
+
+    def handle(self, *args, **options):
+        post = sample_post()
+        with bench_cache():
+            bodies = self.sample_bodies(post)
+        encoders = [GzipEncoder]
+        if brotli is not None:
+            encoders.append(BrotliEncoder)
+        else:
+            self.stderr.write('Пакет brotli не установлен, только gzip.')
+        for name, body in bodies.items():
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f'{name}: {len(body)} байт'))
+            for encoder_class in encoders:
+                for level in encoder_class.levels:
+                    self.measure(encoder_class(level), body,
+                                 options['repeat'])
+
+    def sample_bodies(self, post):
+        host = bench_host()
+        client = Client(HTTP_HOST=host)
+        urls = {
+            'index': reverse('posts:index'),
+            'group': reverse('posts:group_posts',
+                             kwargs={'slug': post.group.slug}),
+            'post': reverse('posts:post_detail',
+                            kwargs={'post_id': post.id}),
+            'rss': reverse('posts:index_rss'),
+            'api': reverse('api:post_list'),
+            'export': reverse('posts:group_export',
+                              kwargs={'slug': post.group.slug,
+                                      'fmt': 'csv'}),
+        }
+        bodies = {}
+        for name, url in urls.items():
+            response = client.get(url)
+            if response.status_code != 200:
+                raise CommandError(f'{url}: статус {response.status_code}')
+            bodies[name] = (b''.join(response.streaming_content)
+                            if response.streaming else response.content)
+        return bodies
+
+    def measure(self, encoder, body, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            compressed = encoder.compress(body)
+            timings.append((time.perf_counter() - started) * 1000)
+        stats = summarize(timings)
+        throughput = len(body) / 1024 / 1024 / (stats['p50_ms'] / 1000 or 1)
+        self.stdout.write(
+            f'  {encoder.name:>4} {encoder.level:>2}: '
+            f'{len(compressed):>8} байт '
+            f'({len(compressed) / len(body):6.1%}), '
+            f'p50 {stats["p50_ms"]} мс, {throughput:.1f} МиБ/с'
+        )
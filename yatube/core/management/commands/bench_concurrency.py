@@ -0,0 +1,115 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.servers.basehttp import (ThreadedWSGIServer,
+                                          WSGIRequestHandler)
+from django.core.wsgi import get_wsgi_application
+from django.urls import reverse
+
+from core.benchmarks import bench_cache, bench_host, sample_post, summarize
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет пропускную способность лент (index, group_posts, '
+        'profile, post_detail) при разном числе одновременных '
+        'клиентов. По умолчанию поднимает многопоточный WSGI-сервер '
+        'в этом же процессе; --base-url позволяет замерить внешний '
+        'сервер (gunicorn, uWSGI) без влияния GIL клиента.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency', default='1,2,4,8,16',
+            help='Числа одновременных клиентов через запятую',
+        )
+        parser.add_argument(
+            '--requests', type=int, default=200,
+            help='Запросов на каждый уровень',
+        )
+        parser.add_argument(
+            '--base-url', help='Например, http://127.0.0.1:8000')
+        parser.add_argument('--output', help='Записать JSON в файл')
+
+    def handle(self, *args, **options):
+        try:
+            levels = [int(level) for level in
+                      options['concurrency'].split(',')]
+        except ValueError:
+            raise CommandError('--concurrency: ожидаются целые числа')
+        post = sample_post()
+        paths = [
+            reverse('posts:index'),
+            reverse('posts:group_posts', kwargs={'slug': post.group.slug}),
+            reverse('posts:profile',
+                    kwargs={'username': post.author.username}),
+            reverse('posts:post_detail', kwargs={'post_id': post.id}),
+        ]
+        server = None
+        base_url = options['base_url']
+        if base_url is None:
+            server = ThreadedWSGIServer(('127.0.0.1', 0), QuietHandler)
+            server.set_app(get_wsgi_application())
+            threading.Thread(target=server.serve_forever,
+                             daemon=True).start()
+            base_url = 'http://127.0.0.1:{}'.format(server.server_port)
+        host = bench_host()
+        urls = [Request(base_url.rstrip('/') + path, headers={'Host': host})
+                for path in paths]
+        report = {'base_url': base_url, 'paths': paths, 'levels': []}
+        try:
+            # Встроенный сервер работает в этом процессе и пишет в кеш
+            # замеров, а не в кеш сайта.
+            with bench_cache():
+                for level in levels:
+                    result = self.measure(urls, level, options['requests'])
+                    report['levels'].append(result)
+                    self.stdout.write(
+                        f'{level:>4} клиентов: {result["rps"]:8.1f} '
+                        f'запр/с, p50 {result["p50_ms"]} мс, '
+                        f'p95 {result["p95_ms"]} мс, '
+                        f'ошибок {result["errors"]}'
+                    )
+        finally:
+            if server is not None:
+                server.shutdown()
+                server.server_close()
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump(report, file, ensure_ascii=False, indent=2)
+
+    def fetch(self, request):
+        started = time.perf_counter()
+        try:
+            with urlopen(request) as response:
+                response.read()
+            ok = True
+        except HTTPError:
+            ok = False
+        return (time.perf_counter() - started) * 1000, ok
+
+    def measure(self, urls, level, total):
+        # Адреса идут по кругу, чтобы каждый уровень получал
+        # одинаковую смесь представлений.
+        requests = [urls[number % len(urls)] for number in range(total)]
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=level) as pool:
+            results = list(pool.map(self.fetch, requests))
+        elapsed = time.perf_counter() - started
+        timings = [timing for timing, ok in results]
+        return {
+            'concurrency': level,
+            'rps': round(total / elapsed, 1),
+            'errors': sum(not ok for timing, ok in results),
+            **summarize(timings),
+        }
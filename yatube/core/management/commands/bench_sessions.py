@@ -0,0 +1,96 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from core.benchmarks import bench_cache, bench_host, sample_post, summarize
+
+DJANGO_AUTH = 'django.contrib.auth.middleware.AuthenticationMiddleware'
+CACHED_AUTH = 'users.middleware.CachedAuthenticationMiddleware'
+SESSION_ENGINES = 'django.contrib.sessions.backends'
+
+CONFIGS = (
+    ('db', f'{SESSION_ENGINES}.db', DJANGO_AUTH),
+    ('cached_db + кеш пользователя', f'{SESSION_ENGINES}.cached_db',
+     CACHED_AUTH),
+    ('signed_cookies + кеш пользователя',
+     f'{SESSION_ENGINES}.signed_cookies', CACHED_AUTH),
+)
+
+# Запросы, которые делают сессия и AuthenticationMiddleware: чтение
+# сессии и пользователя по id (страницы ищут авторов по username).
+AUTH_SQL = (
+    'FROM "django_session"',
+    'FROM "auth_user" WHERE "auth_user"."id" =',
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает хранение сессий в базе, cached_db и signed_cookies '
+        'вместе с кешем пользователя: сколько SQL-запросов к сессиям и '
+        'пользователям делает авторизованный клиент на каждой странице.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=50)
+
+    def handle(self, *args, **options):
+        post = sample_post()
+        urls = {
+            'index': reverse('posts:index'),
+            'group': reverse('posts:group_posts',
+                             kwargs={'slug': post.group.slug}),
+            'profile': reverse('posts:profile',
+                               kwargs={'username': post.author.username}),
+            'post': reverse('posts:post_detail',
+                            kwargs={'post_id': post.id}),
+            'about': reverse('about:author'),
+        }
+        baseline = None
+        for name, engine, auth_middleware in CONFIGS:
+            middleware = [
+                auth_middleware if path in (DJANGO_AUTH, CACHED_AUTH)
+                else path for path in settings.MIDDLEWARE
+            ]
+            with bench_cache(), override_settings(SESSION_ENGINE=engine,
+                                                  MIDDLEWARE=middleware):
+                results = self.measure(post.author, urls,
+                                       options['requests'])
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            for url_name, (queries, auth_queries, stats) in results.items():
+                saved = (f', сэкономлено '
+                         f'{baseline[url_name][0] - queries:.1f}'
+                         if baseline else '')
+                self.stdout.write(
+                    f'  {url_name:>8}: запросов {queries:.1f}, из них '
+                    f'сессия и пользователь {auth_queries:.1f}{saved}, '
+                    f'p50 {stats["p50_ms"]} мс'
+                )
+            baseline = baseline or results
+
+    def measure(self, user, urls, requests):
+        host = bench_host()
+        client = Client(HTTP_HOST=host)
+        client.force_login(user)
+        results = {}
+        for url_name, url in urls.items():
+            client.get(url)
+            timings = []
+            queries = auth_queries = 0
+            for _ in range(requests):
+                with CaptureQueriesContext(connection) as captured:
+                    started = time.perf_counter()
+                    client.get(url)
+                    timings.append((time.perf_counter() - started) * 1000)
+                queries += len(captured)
+                auth_queries += sum(
+                    any(marker in query['sql'] for marker in AUTH_SQL)
+                    for query in captured)
+            results[url_name] = (queries / requests,
+                                 auth_queries / requests, summarize(timings))
+        return results
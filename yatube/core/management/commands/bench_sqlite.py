@@ -0,0 +1,129 @@
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connections, transaction
+
+from core.benchmarks import summarize
+from posts.models import Post, User
+
+PROFILES = {
+    'stock': 'django.db.backends.sqlite3',
+    'tuned': 'core.db_backends.sqlite3',
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Смешанная нагрузка чтения и записи из нескольких потоков на '
+        'копию базы: стандартный бэкенд sqlite3 против '
+        'core.db_backends.sqlite3 (WAL, PRAGMA, BEGIN IMMEDIATE). '
+        'Показывает число ошибок «database is locked» и p99.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument(
+            '--operations', type=int, default=200,
+            help='Операций на поток',
+        )
+        parser.add_argument(
+            '--write-share', type=float, default=0.2,
+            help='Доля операций записи',
+        )
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        if connections['default'].vendor != 'sqlite':
+            raise CommandError('Замер рассчитан на бэкенд sqlite3.')
+        self.author_id = User.objects.values_list('id', flat=True).first()
+        if self.author_id is None:
+            raise CommandError(
+                'В базе нет пользователей: выполните generate_dataset.')
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for profile, engine in PROFILES.items():
+                alias = f'bench_{profile}'
+                self.copy_database(os.path.join(tmpdir, f'{alias}.sqlite3'),
+                                   alias, engine)
+                try:
+                    self.report(profile, self.run(alias, options))
+                finally:
+                    connections[alias].close()
+                    del connections.databases[alias]
+
+    def copy_database(self, path, alias, engine):
+        connections['default'].ensure_connection()
+        target = sqlite3.connect(path)
+        connections['default'].connection.backup(target)
+        target.close()
+        connections.databases[alias] = {
+            'ENGINE': engine,
+            'NAME': path,
+            # Стандартный бэкенд получает таймаут по умолчанию модуля
+            # sqlite3 (5 с), как в settings.py.
+            'OPTIONS': {},
+        }
+        connections.ensure_defaults(alias)
+
+    def run(self, alias, options):
+        results = {'read': [], 'write': [], 'errors': 0}
+        lock = threading.Lock()
+        barrier = threading.Barrier(options['threads'])
+
+        def worker(number):
+            rnd = random.Random(options['seed'] + number)
+            timings = {'read': [], 'write': []}
+            errors = 0
+            barrier.wait()
+            for _ in range(options['operations']):
+                kind = ('write' if rnd.random() < options['write_share']
+                        else 'read')
+                started = time.perf_counter()
+                try:
+                    getattr(self, kind)(alias)
+                except OperationalError:
+                    errors += 1
+                    continue
+                timings[kind].append((time.perf_counter() - started) * 1000)
+            connections[alias].close()
+            with lock:
+                results['read'] += timings['read']
+                results['write'] += timings['write']
+                results['errors'] += errors
+
+        threads = [threading.Thread(target=worker, args=(number,))
+                   for number in range(options['threads'])]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        results['elapsed'] = time.perf_counter() - started
+        return results
+
+    def read(self, alias):
+        list(Post.objects.using(alias).select_related('author', 'group')
+             .order_by('-pub_date')[:10])
+
+    def write(self, alias):
+        # Как при создании поста: чтение и запись в одной транзакции.
+        with transaction.atomic(using=alias):
+            Post.objects.using(alias).filter(
+                author_id=self.author_id).count()
+            Post.objects.using(alias).bulk_create(
+                [Post(author_id=self.author_id, text='Нагрузка')])
+
+    def report(self, profile, results):
+        done = len(results['read']) + len(results['write'])
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f'{profile}: {done / results["elapsed"]:.0f} операций/с, '
+            f'ошибок «database is locked»: {results["errors"]}'))
+        for kind in ('read', 'write'):
+            stats = summarize(results[kind])
+            self.stdout.write(
+                f'  {kind}: p50 {stats["p50_ms"]} мс, '
+                f'p99 {stats["p99_ms"]} мс')
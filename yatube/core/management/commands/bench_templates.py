@@ -0,0 +1,112 @@
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from django.utils.safestring import mark_safe
+
+from core.benchmarks import summarize
+from posts.cache import CARD_TEMPLATE
+from posts.models import Group, Post, User
+from posts.paginators import FeedPaginator
+from posts.rendering import render_text
+from posts.views import NUMBER_OF_POSTS
+
+PAGE_TEMPLATE = 'posts/index.html'
+CACHED_LOADER = 'django.template.loaders.cached.Loader'
+BASE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет рендеринг страницы ленты из 10 постов (карточки и '
+        'posts/index.html) с загрузчиками шаблонов по умолчанию и с '
+        'cached.Loader: время на рендер и выделенную память.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--renders', type=int, default=200)
+
+    def handle(self, *args, **options):
+        request = RequestFactory().get('/')
+        request.user = AnonymousUser()
+        posts = self.sample_posts()
+        for name, loaders in (('default', BASE_LOADERS),
+                              ('cached', [(CACHED_LOADER, BASE_LOADERS)])):
+            backend = self.backend(loaders)
+            render = self.renderer(backend, posts, request)
+            render()
+            timings = []
+            for _ in range(options['renders']):
+                started = time.perf_counter()
+                render()
+                timings.append((time.perf_counter() - started) * 1000)
+            peak, retained = self.allocations(render)
+            stats = summarize(timings)
+            self.stdout.write(
+                f'{name:>8}: p50 {stats["p50_ms"]} мс, '
+                f'p95 {stats["p95_ms"]} мс, пик памяти {peak / 1024:.1f} КиБ, '
+                f'удержано блоков {retained}'
+            )
+
+    def backend(self, loaders):
+        config = settings.TEMPLATES[0]
+        options = {**config['OPTIONS'], 'loaders': loaders}
+        return import_string(config['BACKEND'])({
+            'NAME': 'bench',
+            'DIRS': config.get('DIRS', []),
+            'APP_DIRS': False,
+            'OPTIONS': options,
+        })
+
+    def sample_posts(self):
+        """Посты в памяти: замер не зависит от содержимого базы."""
+        group = Group(id=1, title='Группа', slug='group')
+        authors = [User(id=number, username=f'user_{number}',
+                        first_name='Анна', last_name='Иванова')
+                   for number in range(1, 4)]
+        start = timezone.make_aware(datetime(2020, 1, 1))
+        text = 'Текст поста ' * 20
+        return [
+            Post(id=number, text=text, text_html=render_text(text),
+                 pub_date=start + timedelta(minutes=number),
+                 author=authors[number % len(authors)],
+                 group=group if number % 2 else None)
+            for number in range(1, NUMBER_OF_POSTS + 1)
+        ]
+
+    def renderer(self, backend, posts, request):
+        page_obj = FeedPaginator(posts, NUMBER_OF_POSTS).get_page(1)
+
+        def render():
+            # Карточки рендерятся как при промахе кеша карточек,
+            # то есть по шаблону на каждый пост ленты.
+            for post in posts:
+                post.card_html = mark_safe(
+                    backend.get_template(CARD_TEMPLATE).render(
+                        {'post': post}))
+            return backend.get_template(PAGE_TEMPLATE).render(
+                {'page_obj': page_obj, 'title': 'Лента'}, request)
+        return render
+
+    def allocations(self, render):
+        tracemalloc.start()
+        try:
+            before = tracemalloc.take_snapshot()
+            render()
+            after = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        retained = sum(
+            max(stat.count_diff, 0)
+            for stat in after.compare_to(before, 'lineno'))
+        return peak, retained
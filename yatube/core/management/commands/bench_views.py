@@ -0,0 +1,148 @@
+import json
+import time
+from importlib import import_module
+
+from django.contrib.auth.tokens import default_token_generator
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, reverse
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+
+from core.benchmarks import bench_cache, bench_host, sample_post, summarize
+
+URLCONFS = ('posts.urls', 'users.urls', 'about.urls', 'api.urls')
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет задержку (p50/p95/p99), число SQL-запросов и размер '
+        'ответа для каждого маршрута posts, users, about и api. '
+        'Результат выводится в JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests', type=int, default=50,
+            help='Замеров на маршрут для каждого клиента',
+        )
+        parser.add_argument('--warmup', type=int, default=3)
+        parser.add_argument(
+            '--cold', action='store_true',
+            help='Очищать кеш перед каждым запросом',
+        )
+        parser.add_argument('--output', help='Записать JSON в файл')
+        parser.add_argument(
+            '--compare',
+            help='JSON прошлого прогона, с которым сравнить результат',
+        )
+        parser.add_argument(
+            '--threshold', type=float, default=10.0,
+            help='Рост p95 в процентах, который считается регрессией',
+        )
+
+    def handle(self, *args, **options):
+        post = sample_post()
+        self.author = post.author
+        samples = {
+            'slug': post.group.slug,
+            'username': post.author.username,
+            'post_id': post.id,
+            'fmt': 'csv',
+            'uidb64': urlsafe_base64_encode(force_bytes(post.author.pk)),
+            'token': default_token_generator.make_token(post.author),
+        }
+        host = bench_host()
+        clients = {
+            'guest': Client(HTTP_HOST=host),
+            'author': Client(HTTP_HOST=host),
+        }
+        clients['author'].force_login(self.author)
+
+        report = {'requests': options['requests'], 'routes': {}}
+        with bench_cache() as self.cache:
+            for name, url in self.routes(samples):
+                report['routes'][name] = {
+                    client_name: self.measure(client, client_name, name,
+                                              url, options)
+                    for client_name, client in clients.items()
+                }
+        dump = json.dumps(report, ensure_ascii=False, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                file.write(dump)
+        else:
+            self.stdout.write(dump)
+        if options['compare']:
+            self.compare(report, options['compare'], options['threshold'])
+
+    def routes(self, samples):
+        for urlconf in URLCONFS:
+            module = import_module(urlconf)
+            for pattern in module.urlpatterns:
+                if not isinstance(pattern, URLPattern) or not pattern.name:
+                    continue
+                name = f'{module.app_name}:{pattern.name}'
+                params = getattr(pattern.pattern, 'converters', {})
+                missing = set(params) - set(samples)
+                if missing:
+                    self.stderr.write(
+                        f'{name}: пропущен, нет значений для {missing}')
+                    continue
+                yield name, reverse(
+                    name, kwargs={param: samples[param] for param in params})
+
+    def measure(self, client, client_name, name, url, options):
+        timings = []
+        query_count = size = status = None
+        for number in range(options['warmup'] + options['requests']):
+            if options['cold']:
+                self.cache.clear()
+            if client_name == 'author' and name == 'users:logout':
+                client.force_login(self.author)
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = client.get(url)
+                if response.streaming:
+                    size = sum(len(chunk) for chunk in response)
+                else:
+                    size = len(response.content)
+                elapsed = (time.perf_counter() - started) * 1000
+            if number < options['warmup']:
+                continue
+            timings.append(elapsed)
+            query_count = len(captured)
+            status = response.status_code
+        return {
+            'url': url,
+            'status': status,
+            'queries': query_count,
+            'bytes': size,
+            **summarize(timings),
+        }
+
+    def compare(self, report, path, threshold):
+        with open(path, encoding='utf-8') as file:
+            baseline = json.load(file)['routes']
+        self.stdout.write(self.style.MIGRATE_HEADING(f'Сравнение с {path}'))
+        for name, clients in report['routes'].items():
+            for client_name, result in clients.items():
+                before = baseline.get(name, {}).get(client_name)
+                if before is None:
+                    continue
+                change = (
+                    (result['p95_ms'] - before['p95_ms'])
+                    / before['p95_ms'] * 100 if before['p95_ms'] else 0.0
+                )
+                line = (
+                    f'{name} [{client_name}]: p95 {before["p95_ms"]} -> '
+                    f'{result["p95_ms"]} мс ({change:+.1f}%), запросов '
+                    f'{before["queries"]} -> {result["queries"]}, байт '
+                    f'{before["bytes"]} -> {result["bytes"]}'
+                )
+                regressed = (change > threshold
+                             or result['queries'] > before['queries'])
+                style = self.style.ERROR if regressed else self.style.SUCCESS
+                self.stdout.write(style(line))
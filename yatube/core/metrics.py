@@ -0,0 +1,90 @@
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+# Границы корзин гистограммы времени ответа, мс.
+BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, float('inf'))
+
+current_metrics = ContextVar('current_metrics', default=None)
+
+
+class RequestMetrics:
+    """Счётчики одного запроса: SQL, шаблоны и обработчик."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_ms = 0.0
+        self.template_ms = 0.0
+        self.view_ms = 0.0
+        self._template_depth = 0
+
+    def record_query(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_ms += (time.perf_counter() - started) * 1000
+            self.queries += 1
+
+    def time_template(self, render):
+        # Вложенный render_to_string уже учтён внешним рендерингом.
+        self._template_depth += 1
+        started = time.perf_counter()
+        try:
+            return render()
+        finally:
+            self._template_depth -= 1
+            if not self._template_depth:
+                self.template_ms += (time.perf_counter() - started) * 1000
+
+
+class ViewHistograms:
+    """Гистограммы времени ответа по view_name в пределах процесса."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+
+    def observe(self, view_name, total_ms, metrics):
+        with self._lock:
+            stats = self._views.setdefault(view_name, {
+                'count': 0,
+                'total_ms': 0.0,
+                'db_ms': 0.0,
+                'template_ms': 0.0,
+                'queries': 0,
+                'buckets': [0] * len(BUCKETS_MS),
+            })
+            stats['count'] += 1
+            stats['total_ms'] += total_ms
+            stats['db_ms'] += metrics.db_ms
+            stats['template_ms'] += metrics.template_ms
+            stats['queries'] += metrics.queries
+            stats['buckets'][bisect_left(BUCKETS_MS, total_ms)] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                view_name: {
+                    'count': stats['count'],
+                    'avg_ms': stats['total_ms'] / stats['count'],
+                    'avg_db_ms': stats['db_ms'] / stats['count'],
+                    'avg_template_ms':
+                        stats['template_ms'] / stats['count'],
+                    'avg_queries': stats['queries'] / stats['count'],
+                    'buckets': {
+                        ('+Inf' if bound == float('inf') else str(bound)):
+                            count
+                        for bound, count in zip(BUCKETS_MS, stats['buckets'])
+                    },
+                }
+                for view_name, stats in self._views.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+
+
+histograms = ViewHistograms()
@@ -0,0 +1,248 @@
+import json
+import logging
+import mimetypes
+import os
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import SuspiciousFileOperation
+from django.db import connections
+from django.http import FileResponse
+from django.utils._os import safe_join
+from django.utils.cache import patch_vary_headers
+
+from .compression import (COMPRESSIBLE_TYPES, accepted_encodings,
+                          available_encoders)
+from .db_routers import replica_reads
+from .metrics import RequestMetrics, current_metrics, histograms
+
+logger = logging.getLogger('yatube.requests')
+
+
+class RequestMetricsMiddleware:
+    """Считает SQL-запросы, время шаблонов и обработчика для запроса.
+
+    Итог отдаётся в заголовке Server-Timing, пишется строкой JSON
+    в логгер ``yatube.requests`` и копится в гистограммах по
+    view_name. Стоит первым в MIDDLEWARE, чтобы учесть запросы
+    остальных middleware (сессии, пользователь).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.slow_ms = getattr(settings, 'SLOW_REQUEST_MS', 500)
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        request.view_started = None
+        token = current_metrics.set(metrics)
+        started = time.perf_counter()
+        try:
+            with self.record_queries(metrics):
+                response = self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        if request.view_started is not None:
+            metrics.view_ms = (
+                (time.perf_counter() - request.view_started) * 1000)
+        # Заголовки потокового ответа уходят до тела: Server-Timing
+        # описывает только обработчик, а итог с запросами, которые
+        # делает итератор тела, записывается, когда поток закончится.
+        response['Server-Timing'] = self.server_timing(
+            metrics, (time.perf_counter() - started) * 1000)
+        if response.streaming:
+            response.streaming_content = self.stream(
+                response.streaming_content, request, response, metrics,
+                started)
+        else:
+            self.record(request, response, metrics, started)
+        return response
+
+    def record_queries(self, metrics):
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(
+                connection.execute_wrapper(metrics.record_query))
+        return stack
+
+    def stream(self, content, request, response, metrics, started):
+        try:
+            with self.record_queries(metrics):
+                yield from content
+        finally:
+            self.record(request, response, metrics, started)
+
+    @staticmethod
+    def server_timing(metrics, total_ms):
+        return ', '.join((
+            f'db;dur={metrics.db_ms:.2f};desc="{metrics.queries} queries"',
+            f'tpl;dur={metrics.template_ms:.2f}',
+            f'view;dur={metrics.view_ms:.2f}',
+            f'total;dur={total_ms:.2f}',
+        ))
+
+    def record(self, request, response, metrics, started):
+        total_ms = (time.perf_counter() - started) * 1000
+        match = request.resolver_match
+        view_name = match.view_name if match else None
+        logger.log(
+            logging.WARNING if total_ms >= self.slow_ms else logging.INFO,
+            json.dumps({
+                'view_name': view_name,
+                'method': request.method,
+                'path': request.path,
+                'status': response.status_code,
+                'streaming': response.streaming,
+                'total_ms': round(total_ms, 2),
+                'view_ms': round(metrics.view_ms, 2),
+                'db_ms': round(metrics.db_ms, 2),
+                'queries': metrics.queries,
+                'template_ms': round(metrics.template_ms, 2),
+            }),
+        )
+        histograms.observe(view_name, total_ms, metrics)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.view_started = time.perf_counter()
+
+
+class CompressionMiddleware:
+    """Сжимает текстовые ответы в brotli или gzip.
+
+    Кодировка выбирается по Accept-Encoding (brotli, если пакет
+    установлен, иначе gzip). Не сжимаются ответы короче
+    COMPRESSION_MIN_SIZE байт, ответы с нетекстовым типом и уже
+    сжатые, например статика из StaticFilesMiddleware. Потоковые
+    ответы сжимаются по мере отдачи, не собираясь в памяти.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.min_size = getattr(settings, 'COMPRESSION_MIN_SIZE', 500)
+        self.encoders = available_encoders(
+            gzip_level=getattr(settings, 'COMPRESSION_GZIP_LEVEL', 6),
+            brotli_level=getattr(settings, 'COMPRESSION_BROTLI_LEVEL', 4),
+        )
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if not self.compressible(response):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        accepted = accepted_encodings(request)
+        encoder = next(
+            (encoder for encoder in self.encoders
+             if encoder.name in accepted), None)
+        if encoder is None:
+            return response
+        if response.streaming:
+            response.streaming_content = encoder.stream(
+                response.streaming_content)
+            del response['Content-Length']
+        else:
+            compressed = encoder.compress(response.content)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+        # Сжатое тело отличается побайтно, поэтому сильный ETag
+        # становится слабым; If-None-Match продолжает с ним совпадать.
+        etag = response.get('ETag', '')
+        if etag.startswith('"'):
+            response['ETag'] = f'W/{etag}'
+        response['Content-Encoding'] = encoder.name
+        return response
+
+    def compressible(self, response):
+        content_type = response.get('Content-Type', '').partition(';')[0]
+        if (response.has_header('Content-Encoding')
+                or content_type.strip().lower() not in COMPRESSIBLE_TYPES
+                or 'no-transform' in response.get('Cache-Control', '')):
+            return False
+        return response.streaming or len(response.content) >= self.min_size
+
+
+class ReplicaRoutingMiddleware:
+    """Направляет чтение безопасных запросов на реплики.
+
+    POST и другие изменяющие запросы целиком идут в основную базу
+    и ставят cookie, по которой следующие REPLICA_PIN_SECONDS секунд
+    запросы этого клиента тоже читают с основной базы: так автор
+    сразу видит свой пост, даже если реплика отстаёт.
+    """
+    cookie_name = 'use_primary'
+    safe_methods = ('GET', 'HEAD', 'OPTIONS')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.pin_seconds = getattr(settings, 'REPLICA_PIN_SECONDS', 5)
+
+    def __call__(self, request):
+        if request.method not in self.safe_methods:
+            response = self.get_response(request)
+            response.set_cookie(
+                self.cookie_name, '1', max_age=self.pin_seconds,
+                httponly=True, samesite='Lax')
+            return response
+        if request.COOKIES.get(self.cookie_name):
+            return self.get_response(request)
+        with replica_reads():
+            return self.get_response(request)
+
+
+class StaticFilesMiddleware:
+    """Отдаёт собранную collectstatic статику из STATIC_ROOT.
+
+    Если клиент принимает br или gzip и рядом с файлом лежит сжатая
+    копия, отдаётся она. Файлы с хешем содержимого в имени (из
+    манифеста ManifestStaticFilesStorage) кешируются на год как
+    immutable, остальные — на STATIC_MAX_AGE секунд.
+    """
+    immutable_max_age = 60 * 60 * 24 * 365
+    encodings = (('br', '.br'), ('gzip', '.gz'))
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.prefix = settings.STATIC_URL
+        self.root = getattr(settings, 'STATIC_ROOT', None)
+        self.max_age = getattr(settings, 'STATIC_MAX_AGE', 60)
+        self.hashed_names = set(
+            getattr(staticfiles_storage, 'hashed_files', {}).values())
+
+    def __call__(self, request):
+        if (self.root and request.method in ('GET', 'HEAD')
+                and request.path.startswith(self.prefix)):
+            response = self.serve(request, request.path[len(self.prefix):])
+            if response is not None:
+                return response
+        return self.get_response(request)
+
+    def serve(self, request, name):
+        try:
+            path = safe_join(self.root, name)
+        except SuspiciousFileOperation:
+            return None
+        if not os.path.isfile(path):
+            return None
+        content_type, _ = mimetypes.guess_type(path)
+        accepted = accepted_encodings(request)
+        encoding = None
+        for candidate, suffix in self.encodings:
+            if candidate in accepted and os.path.isfile(path + suffix):
+                path += suffix
+                encoding = candidate
+                break
+        response = FileResponse(
+            open(path, 'rb'),
+            content_type=content_type or 'application/octet-stream')
+        if encoding:
+            response['Content-Encoding'] = encoding
+        response['Vary'] = 'Accept-Encoding'
+        if name in self.hashed_names:
+            response['Cache-Control'] = (
+                f'public, max-age={self.immutable_max_age}, immutable')
+        else:
+            response['Cache-Control'] = f'public, max-age={self.max_age}'
+        return response
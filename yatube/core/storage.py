@@ -0,0 +1,38 @@
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+from .compression import available_encoders
+
+COMPRESSIBLE_EXTENSIONS = (
+    '.css', '.js', '.svg', '.ico', '.txt', '.html', '.json', '.xml', '.map',
+)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Статика с хешем содержимого в имени и заранее сжатыми копиями.
+
+    collectstatic кладёт рядом с каждым текстовым файлом с хешем
+    ``.gz`` и, если установлен пакет brotli, ``.br``. Копия
+    сохраняется, только если она меньше исходного файла.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        for name, hashed_name, processed in super().post_process(
+                paths, dry_run=dry_run, **options):
+            if (not dry_run and hashed_name
+                    and not isinstance(processed, Exception)
+                    and hashed_name.endswith(COMPRESSIBLE_EXTENSIONS)):
+                self.compress(hashed_name)
+            yield name, hashed_name, processed
+
+    def compress(self, name):
+        with self.open(name) as file:
+            data = file.read()
+        # Копии сжимаются один раз при сборке, поэтому уровень максимальный.
+        for encoder in available_encoders(gzip_level=9, brotli_level=11):
+            compressed = encoder.compress(data)
+            if len(compressed) >= len(data):
+                continue
+            if self.exists(name + encoder.suffix):
+                self.delete(name + encoder.suffix)
+            self._save(name + encoder.suffix, ContentFile(compressed))
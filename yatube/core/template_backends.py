@@ -0,0 +1,30 @@
+from django.template.backends.django import DjangoTemplates
+
+from .metrics import current_metrics
+
+
+class TimedTemplate:
+    """Обёртка шаблона, которая добавляет время рендеринга
+    в метрики текущего запроса.
+    """
+
+    def __init__(self, wrapped):
+        self._wrapped = wrapped
+
+    def __getattr__(self, name):
+        return getattr(self._wrapped, name)
+
+    def render(self, context=None, request=None):
+        metrics = current_metrics.get()
+        if metrics is None:
+            return self._wrapped.render(context, request)
+        return metrics.time_template(
+            lambda: self._wrapped.render(context, request))
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name))
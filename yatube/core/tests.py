@@ -0,0 +1,369 @@
+import gzip
+import importlib
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import connection, connections
+from django.templatetags.static import static
+from django.test import Client, SimpleTestCase, TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from posts.cache import INDEX_SCOPE, feed_count_key
+from posts.models import Group, Post
+
+from .benchmarks import bench_cache
+from .compression import STREAM_FLUSH_BYTES, GzipEncoder
+from .db_backends.sqlite3.base import PRAGMAS, DatabaseWrapper
+from .metrics import histograms
+
+User = get_user_model()
+
+
+class RequestMetricsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@yatube.ru', password='pass')
+
+    def setUp(self):
+        histograms.reset()
+        self.guest_client = Client()
+        self.admin_client = Client()
+        self.admin_client.force_login(self.admin)
+
+    def test_server_timing_header(self):
+        """Ответ содержит Server-Timing с SQL, шаблонами и обработчиком."""
+        response = self.admin_client.get('/about/author/')
+        timing = response['Server-Timing']
+        for metric in ('db;dur=', 'queries"', 'tpl;dur=', 'view;dur=',
+                       'total;dur='):
+            with self.subTest(metric=metric):
+                self.assertIn(metric, timing)
+
+    def test_metrics_endpoint(self):
+        """Гистограммы по view_name доступны только администратору."""
+        self.guest_client.get('/about/tech/')
+        response = self.guest_client.get('/metrics/')
+        self.assertEqual(response.status_code, 302)
+        response = self.admin_client.get('/metrics/')
+        snapshot = json.loads(response.content)
+        self.assertEqual(snapshot['about:tech']['count'], 1)
+        self.assertEqual(sum(snapshot['about:tech']['buckets'].values()), 1)
+
+    def test_streaming_queries_counted(self):
+        """Запросы итератора потокового ответа попадают в гистограмму."""
+        group = Group.objects.create(title='Группа', slug='group')
+        Post.objects.bulk_create(
+            Post(author=self.admin, group=group, text=f'Пост {number}')
+            for number in range(3))
+        url = reverse('posts:group_export',
+                      kwargs={'slug': group.slug, 'fmt': 'csv'})
+        with CaptureQueriesContext(connection) as captured:
+            response = self.admin_client.get(url)
+            self.assertIsNone(histograms.snapshot().get('posts:group_export'))
+            b''.join(response.streaming_content)
+        stats = histograms.snapshot()['posts:group_export']
+        self.assertEqual(stats['count'], 1)
+        self.assertEqual(stats['avg_queries'], len(captured))
+
+    def test_metrics_report_card_cache(self):
+        """В /metrics/ есть доля попаданий в кеш карточек этого процесса."""
+        cache.clear()
+        Post.objects.create(author=self.admin, text='Пост для карточки')
+        for _ in range(2):
+            self.admin_client.get(reverse('posts:index'))
+        card_cache = json.loads(
+            self.admin_client.get('/metrics/').content)['card_cache']
+        self.assertEqual((card_cache['hits'], card_cache['misses']), (1, 1))
+
+
+class CompressionTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='MikeyMouse')
+        cls.group = Group.objects.create(title='Группа', slug='mouses')
+        cls.post = Post.objects.create(
+            author=cls.user, group=cls.group, text='Длинный пост ' * 50)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def test_html_is_gzipped(self):
+        """Страница сжимается gzip, если клиент его принимает."""
+        plain = self.client.get(reverse('posts:index'))
+        cache.clear()
+        response = self.client.get(
+            reverse('posts:index'), HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertLess(len(response.content), len(plain.content))
+        self.assertEqual(int(response['Content-Length']),
+                         len(response.content))
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+
+    def test_not_compressed_without_accept_encoding(self):
+        """Без Accept-Encoding ответ отдаётся как есть."""
+        response = self.client.get(reverse('posts:index'))
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_small_response_is_not_compressed(self):
+        """Ответ короче COMPRESSION_MIN_SIZE не сжимается."""
+        response = self.client.get(
+            reverse('api:group_detail', kwargs={'slug': 'no-such-group'}),
+            HTTP_ACCEPT_ENCODING='gzip')
+        self.assertLess(len(response.content), 500)
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_streaming_export_is_gzipped(self):
+        """Потоковый экспорт в CSV и JSONL сжимается по мере отдачи."""
+        for fmt in ('csv', 'jsonl'):
+            with self.subTest(fmt=fmt):
+                response = self.client.get(
+                    reverse('posts:group_export',
+                            kwargs={'slug': self.group.slug, 'fmt': fmt}),
+                    HTTP_ACCEPT_ENCODING='gzip')
+                self.assertTrue(response.streaming)
+                self.assertEqual(response['Content-Encoding'], 'gzip')
+                self.assertFalse(response.has_header('Content-Length'))
+                body = gzip.decompress(
+                    b''.join(response.streaming_content))
+                self.assertIn('Длинный пост', body.decode())
+
+    def test_strong_etag_becomes_weak(self):
+        """Сжатый ответ получает слабый ETag."""
+        response = self.client.get(
+            reverse('posts:post_detail', kwargs={'post_id': self.post.id}),
+            HTTP_ACCEPT_ENCODING='gzip')
+        self.assertTrue(response['ETag'].startswith('W/"'))
+
+    def test_stream_flushes_by_threshold(self):
+        """Поток сбрасывается порциями, а не на каждом куске."""
+        chunks = [b'row,' * 25 + b'\n'] * 1000
+        parts = list(GzipEncoder().stream(chunks))
+        self.assertLess(len(parts), len(chunks) // 10)
+        self.assertGreater(len(parts), sum(map(len, chunks))
+                           // STREAM_FLUSH_BYTES)
+        self.assertEqual(gzip.decompress(b''.join(parts)), b''.join(chunks))
+
+
+class NavigationTests(TestCase):
+    def test_header_links(self):
+        """Шапка берёт адреса из nav_urls, а не из {% url %}."""
+        response = Client().get('/about/author/')
+        nav_urls = response.context['nav_urls']
+        for name in ('index', 'group_index', 'about_author', 'about_tech',
+                     'login', 'signup'):
+            with self.subTest(link=name):
+                self.assertContains(response, f'href="{nav_urls[name]}"')
+
+
+@override_settings(REPLICA_DATABASES=['replica'])
+class ReplicaRoutingTests(TransactionTestCase):
+    """Основная база и реплика — два отдельных файла SQLite."""
+    databases = {'default', 'replica'}
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        connections.databases['replica'] = {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.path.join(cls.tmpdir.name, 'replica.sqlite3'),
+        }
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections['replica'].close()
+        del connections.databases['replica']
+        del connections._connections.replica
+        cls.tmpdir.cleanup()
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='MikeyMouse')
+        self.post = Post.objects.create(
+            author=self.user, text='Пост на реплике')
+        self.sync_replica()
+        self.author_client = Client()
+        self.author_client.force_login(self.user)
+
+    def sync_replica(self):
+        """Реплика — снимок основной базы, дальше она «отстаёт»."""
+        connections['replica'].close()
+        connections['default'].ensure_connection()
+        replica = sqlite3.connect(
+            connections.databases['replica']['NAME'])
+        connections['default'].connection.backup(replica)
+        replica.close()
+
+    def test_reads_go_to_replica_until_write(self):
+        """Ленты читаются с реплики, а после записи — с основной базы."""
+        Post.objects.create(author=self.user, text='Только в основной')
+        url = reverse('posts:profile', kwargs={'username': self.user})
+        response = self.author_client.get(url)
+        self.assertContains(response, 'Пост на реплике')
+        self.assertNotContains(response, 'Только в основной')
+        response = self.author_client.post(
+            reverse('posts:post_create'), {'text': 'Новый пост'},
+            follow=True)
+        self.assertContains(response, 'Новый пост')
+        self.assertContains(response, 'Только в основной')
+
+    def test_replica_reads_do_not_fill_versioned_caches(self):
+        """Чтение с отстающей реплики не оставляет в кеше старые
+        карточки, страницы и счётчики под новыми версиями.
+        """
+        self.post.text = 'Правка в основной'
+        self.post.save()
+        Post.objects.create(author=self.user, text='Только в основной')
+        profile_url = reverse('posts:profile', kwargs={'username': self.user})
+        for client, url in ((self.author_client, profile_url),
+                            (Client(), reverse('posts:index'))):
+            with self.subTest(url=url):
+                response = client.get(url)
+                self.assertContains(response, 'Пост на реплике')
+        self.assertEqual(cache.get(feed_count_key(INDEX_SCOPE)), 2)
+        self.sync_replica()
+        for client, url in ((self.author_client, profile_url),
+                            (Client(), reverse('posts:index'))):
+            with self.subTest(url=url):
+                response = client.get(url)
+                self.assertContains(response, 'Правка в основной')
+                self.assertContains(response, 'Только в основной')
+
+
+class BenchCacheTests(SimpleTestCase):
+    def tearDown(self):
+        cache.clear()
+
+    def test_bench_cache_keeps_site_cache(self):
+        """Замеры очищают и заполняют свой кеш, а не кеш сайта."""
+        cache.set('page', 'сайт')
+        with bench_cache():
+            self.assertIsNone(cache.get('page'))
+            cache.set('page', 'замер')
+            cache.clear()
+        self.assertEqual(cache.get('page'), 'сайт')
+
+
+class ProductionSettingsTests(SimpleTestCase):
+    module = 'yatube.settings_production'
+
+    def load(self, **environ):
+        sys.modules.pop(self.module, None)
+        try:
+            with mock.patch.dict(os.environ, environ):
+                return importlib.import_module(self.module)
+        finally:
+            sys.modules.pop(self.module, None)
+
+    def test_shared_cache_required(self):
+        """Боевой профиль не запускается с кешем в памяти процесса."""
+        with self.assertRaises(ImproperlyConfigured):
+            self.load(CACHE_LOCATION='')
+        with self.assertRaises(ImproperlyConfigured):
+            self.load(
+                CACHE_BACKEND='django.core.cache.backends.locmem.LocMemCache',
+                CACHE_LOCATION='yatube',
+            )
+        caches = self.load(CACHE_LOCATION='127.0.0.1:11211').CACHES
+        self.assertEqual(caches['default']['LOCATION'], '127.0.0.1:11211')
+        self.assertIn('bench', caches)
+
+
+class TunedSqliteBackendTests(TestCase):
+    def test_pragmas_applied_on_connect(self):
+        """Новое соединение получает WAL, busy_timeout и прочие PRAGMA."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            wrapper = DatabaseWrapper({
+                **connections['default'].settings_dict,
+                'NAME': os.path.join(tmpdir, 'tuned.sqlite3'),
+            }, alias='tuned')
+            try:
+                with wrapper.cursor() as cursor:
+                    cursor.execute('PRAGMA journal_mode')
+                    self.assertEqual(cursor.fetchone()[0], 'wal')
+                    cursor.execute('PRAGMA busy_timeout')
+                    self.assertEqual(
+                        cursor.fetchone()[0], PRAGMAS['busy_timeout'])
+            finally:
+                wrapper.close()
+
+
+class StaticPipelineTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.static_root = tempfile.mkdtemp()
+        cls.settings_override = override_settings(
+            STATIC_ROOT=cls.static_root,
+            STATICFILES_STORAGE=(
+                'core.storage.CompressedManifestStaticFilesStorage'),
+            MIDDLEWARE=['core.middleware.StaticFilesMiddleware',
+                        *settings.MIDDLEWARE],
+        )
+        cls.settings_override.enable()
+        call_command('collectstatic', interactive=False, verbosity=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.settings_override.disable()
+        shutil.rmtree(cls.static_root)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.client = Client()
+        self.hashed_url = static('css/bootstrap.min.css')
+
+    def test_static_tag_returns_hashed_name(self):
+        """{% static %} отдаёт имя с хешем содержимого из манифеста."""
+        self.assertRegex(self.hashed_url,
+                         r'^/static/css/bootstrap\.min\.[0-9a-f]{12}\.css$')
+
+    def test_precompressed_copy_is_collected(self):
+        """collectstatic сохраняет рядом с файлом его gzip-копию."""
+        name = self.hashed_url[len(settings.STATIC_URL):]
+        with staticfiles_storage.open(name) as original, \
+                staticfiles_storage.open(name + '.gz') as compressed:
+            self.assertEqual(
+                gzip.decompress(compressed.read()), original.read())
+
+    def test_hashed_file_is_immutable(self):
+        """Файл с хешем кешируется на год и отдаётся сжатым."""
+        response = self.client.get(
+            self.hashed_url, HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertEqual(response['Content-Type'], 'text/css')
+        self.assertEqual(response['Cache-Control'],
+                         'public, max-age=31536000, immutable')
+
+    def test_unhashed_file_has_short_cache(self):
+        """Файл без хеша отдаётся как есть и кешируется ненадолго."""
+        response = self.client.get(
+            '/static/css/bootstrap.min.css', HTTP_ACCEPT_ENCODING='gzip;q=0')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertNotIn('immutable', response['Cache-Control'])
+
+    def test_missing_file_falls_through(self):
+        """Отсутствующий файл передаётся дальше по цепочке middleware."""
+        response = self.client.get('/static/../settings.py')
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,16 @@
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
+
+from posts.cache import card_cache_stats
+
+from .metrics import histograms
+
+
+@staff_member_required
+def metrics(request):
+    # Счётчики кеша карточек читаются из кеша этого процесса: с кешем
+    # в памяти (LocMemCache) их не видно из отдельной команды.
+    return JsonResponse(
+        {**histograms.snapshot(), 'card_cache': card_cache_stats()},
+        json_dumps_params={'ensure_ascii': False},
+    )
@@ -1,6 +1,7 @@
 from django.contrib import admin
 
-from .models import Post, Group
+from .models import FULL_TEXT_FIELDS, Post, Group
+from .search import fts_enabled, matching_ids
 
 
 class PostAdmin(admin.ModelAdmin):
@@ -12,10 +13,31 @@ class PostAdmin(admin.ModelAdmin):
         'group',
     )
     list_editable = ('group',)
+    list_select_related = ('author', 'group')
     search_fields = ('text',)
     list_filter = ('pub_date',)
     empty_value_display = '-пусто-'
 
+    def get_list_display(self, request):
+        # В списке вместо полного текста — анонс: так changelist
+        # не загружает тексты постов целиком.
+        return tuple(
+            'excerpt' if field == 'text' else field
+            for field in super().get_list_display(request)
+        )
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        if request.resolver_match.url_name.endswith('_changelist'):
+            queryset = queryset.defer(*FULL_TEXT_FIELDS)
+        return queryset
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term or not fts_enabled():
+            return super().get_search_results(
+                request, queryset, search_term)
+        return queryset.filter(id__in=matching_ids(search_term)), False
+
 
 admin.site.register(Post, PostAdmin)
 admin.site.register(Group)
@@ -0,0 +1,296 @@
+import hashlib
+import time
+from datetime import datetime, timezone
+from functools import wraps
+
+from django.apps import apps
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+from django.views.decorators.http import condition
+
+from core.db_routers import primary_reads, replica_may_lag
+
+CARD_TEMPLATE = 'includes/post_card.html'
+CARD_TIMEOUT = 60 * 60 * 24
+
+PAGE_TIMEOUT = 60
+PAGE_STALE_TIMEOUT = 60 * 10
+PAGE_LOCK_TIMEOUT = 30
+
+FEED_TIMEOUT = 60 * 60 * 24
+
+# SQLite принимает не больше 500 строк в одном INSERT.
+SCOPE_BATCH_SIZE = 500
+
+INDEX_SCOPE = 'index'
+# Каталог групп: число постов и дата последнего в каждой группе.
+GROUPS_SCOPE = 'groups'
+
+CARD_HITS_KEY = 'posts:card:hits'
+CARD_MISSES_KEY = 'posts:card:misses'
+
+
+def post_version_key(post_id):
+    return f'posts:version:post:{post_id}'
+
+
+def author_version_key(author_id):
+    return f'posts:version:author:{author_id}'
+
+
+def scope_version_key(scope):
+    # slug и username могут содержать символы, недопустимые в ключах
+    # memcached, поэтому имя ленты хешируется.
+    digest = hashlib.md5(scope.encode()).hexdigest()
+    return f'posts:version:scope:{digest}'
+
+
+def group_scope(slug):
+    return f'group:{slug}'
+
+
+def author_scope(username):
+    return f'author:{username}'
+
+
+def get_versions(keys):
+    """Возвращает версии для ключей, заводя недостающие.
+
+    Версия — момент последнего изменения. Если ключ версии вытеснен
+    из кеша, выдаётся новая версия, поэтому старые фрагменты
+    не могут случайно совпасть с ней.
+    """
+    versions = cache.get_many(keys)
+    missing = {key: time.time() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+    return versions
+
+
+def get_scope_version(scope):
+    key = scope_version_key(scope)
+    return get_versions([key])[key]
+
+
+def bump_version(key):
+    cache.set(key, time.time(), None)
+
+
+def bump_post_version(post_id):
+    bump_version(post_version_key(post_id))
+
+
+def bump_post_versions(post_ids):
+    now = time.time()
+    cache.set_many(
+        {post_version_key(post_id): now for post_id in post_ids}, None)
+
+
+def bump_author_version(author_id):
+    bump_version(author_version_key(author_id))
+
+
+def feed_count_key(scope):
+    return scope_version_key(scope).replace(':version:', ':count:', 1)
+
+
+def bump_scopes(scopes):
+    now = time.time()
+    cache.set_many(
+        {scope_version_key(scope): now for scope in scopes}, None)
+    cache.delete_many([feed_count_key(scope) for scope in scopes])
+    touch_scopes(scopes, datetime.fromtimestamp(now, timezone.utc))
+
+
+def touch_scopes(scopes, changed):
+    """Записывает время изменения лент в ScopeVersion.
+
+    По нему строятся ETag и Last-Modified лент (posts/conditional.py):
+    база общая для всех процессов, а кеш может быть у каждого свой.
+    """
+    ScopeVersion = apps.get_model('posts', 'ScopeVersion')
+    scopes = sorted(set(scopes))
+    for start in range(0, len(scopes), SCOPE_BATCH_SIZE):
+        batch = scopes[start:start + SCOPE_BATCH_SIZE]
+        updated = ScopeVersion.objects.filter(scope__in=batch).update(
+            changed=changed)
+        if updated < len(batch):
+            # Строки, обновлённые выше, конфликтуют и пропускаются.
+            ScopeVersion.objects.bulk_create(
+                [ScopeVersion(scope=scope, changed=changed)
+                 for scope in batch],
+                ignore_conflicts=True,
+            )
+
+
+def get_feed_count(scope, queryset):
+    """Число постов в ленте, COUNT(*) выполняется только при промахе.
+
+    Счётчик сбрасывается в bump_scopes при любой записи в ленту
+    и хранится без срока, поэтому считается по основной базе:
+    отстающая реплика оставила бы в кеше старое число.
+    """
+    key = feed_count_key(scope)
+    count = cache.get(key)
+    if count is None:
+        with primary_reads():
+            count = queryset.count()
+        cache.set(key, count, None)
+    return count
+
+
+def _incr(key, delta):
+    if not delta:
+        return
+    cache.add(key, 0, None)
+    cache.incr(key, delta)
+
+
+def render_cards(posts):
+    """Проставляет каждому посту готовую карточку ``post.card_html``.
+
+    Карточки берутся из кеша одним запросом, рендерятся только
+    отсутствующие в нём.
+    """
+    posts = list(posts)
+    if not posts:
+        return posts
+    versions = get_versions(
+        [post_version_key(post.id) for post in posts]
+        + [author_version_key(post.author_id) for post in posts]
+    )
+    keys = {
+        post.id: 'posts:card:{}:{}:{}'.format(
+            post.id,
+            versions[post_version_key(post.id)],
+            versions[author_version_key(post.author_id)],
+        )
+        for post in posts
+    }
+    cached = cache.get_many(keys.values())
+    rendered = {}
+    fresh = {}
+    for post in posts:
+        key = keys[post.id]
+        if key in cached:
+            post.card_html = mark_safe(cached[key])
+            continue
+        post.card_html = render_to_string(CARD_TEMPLATE, {'post': post})
+        rendered[key] = post.card_html
+        # Пост, прочитанный с реплики сразу после правки, мог прийти
+        # в старом виде: такую карточку отдаём, но не кешируем.
+        changed_at = max(versions[post_version_key(post.id)],
+                         versions[author_version_key(post.author_id)])
+        if not replica_may_lag(changed_at):
+            fresh[key] = post.card_html
+    if fresh:
+        cache.set_many(fresh, CARD_TIMEOUT)
+    _incr(CARD_HITS_KEY, len(posts) - len(rendered))
+    _incr(CARD_MISSES_KEY, len(rendered))
+    return posts
+
+
+def card_cache_stats():
+    stats = cache.get_many([CARD_HITS_KEY, CARD_MISSES_KEY])
+    hits = stats.get(CARD_HITS_KEY, 0)
+    misses = stats.get(CARD_MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': hits / total if total else 0.0,
+    }
+
+
+def reset_card_cache_stats():
+    cache.delete_many([CARD_HITS_KEY, CARD_MISSES_KEY])
+
+
+def _page_key(request, version):
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f'posts:page:{version}:{path}'
+
+
+def cache_anonymous_page(get_scope):
+    """Кеширует страницу ленты целиком для анонимных посетителей.
+
+    ``get_scope(**kwargs)`` называет ленту, к которой относится
+    страница. Версия ленты сдвигается сигналами при изменении постов,
+    поэтому сбрасываются только затронутые ленты. Устаревшая по
+    времени страница ещё PAGE_STALE_TIMEOUT секунд отдаётся
+    остальным посетителям, пока один запрос её перерисовывает.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if (request.method not in ('GET', 'HEAD')
+                    or request.user.is_authenticated):
+                return view(request, *args, **kwargs)
+            version_key = scope_version_key(get_scope(**kwargs))
+            version = get_versions([version_key])[version_key]
+            key = _page_key(request, version)
+            entry = cache.get(key)
+            if entry is not None:
+                expires_at, content, content_type = entry
+                if (expires_at > time.time()
+                        or not cache.add(f'{key}:lock', 1,
+                                         PAGE_LOCK_TIMEOUT)):
+                    return HttpResponse(content, content_type=content_type)
+            response = view(request, *args, **kwargs)
+            if (response.status_code == 200 and not response.cookies
+                    and not replica_may_lag(version)):
+                cache.set(
+                    key,
+                    (time.time() + PAGE_TIMEOUT, response.content,
+                     response['Content-Type']),
+                    PAGE_TIMEOUT + PAGE_STALE_TIMEOUT,
+                )
+                cache.delete(f'{key}:lock')
+            return response
+        return wrapper
+    return decorator
+
+
+def cache_feed(get_scope):
+    """Кеширует RSS/Atom ленты до изменения постов в ней.
+
+    Версия ленты служит и ключом кеша, и основой ETag и
+    Last-Modified, так что повторный опрос без изменений получает 304
+    без обращения к базе. Сразу после записи лента собирается по
+    основной базе, иначе старое содержимое с реплики получило бы
+    новый ETag.
+    """
+    def version(request, *args, **kwargs):
+        return get_scope_version(get_scope(**kwargs))
+
+    def etag(request, *args, **kwargs):
+        return _page_key(request, version(request, *args, **kwargs))
+
+    def last_modified(request, *args, **kwargs):
+        return datetime.fromtimestamp(
+            version(request, *args, **kwargs), timezone.utc)
+
+    def decorator(view):
+        @wraps(view)
+        @condition(etag_func=etag, last_modified_func=last_modified)
+        def wrapper(request, *args, **kwargs):
+            key = etag(request, *args, **kwargs).replace(
+                ':page:', ':feed:', 1)
+            entry = cache.get(key)
+            if entry is not None:
+                content, content_type = entry
+                return HttpResponse(content, content_type=content_type)
+            if replica_may_lag(version(request, *args, **kwargs)):
+                with primary_reads():
+                    response = view(request, *args, **kwargs)
+            else:
+                response = view(request, *args, **kwargs)
+            if response.status_code == 200:
+                cache.set(key, (response.content, response['Content-Type']),
+                          FEED_TIMEOUT)
+            return response
+        return wrapper
+    return decorator
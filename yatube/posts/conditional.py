@@ -0,0 +1,91 @@
+import hashlib
+from collections import namedtuple
+
+from django.db.models import Subquery
+from django.utils import timezone
+from django.views.decorators.http import condition
+
+from core.db_routers import replica_may_lag
+
+from .cache import author_scope, group_scope, touch_scopes
+from .models import Group, Post, ScopeVersion, User
+
+PageState = namedtuple('PageState', 'modified token')
+
+
+def post_state(post_id):
+    row = Post.objects.filter(pk=post_id).values_list(
+        'updated', 'group__title', 'author__username', 'author__first_name',
+        'author__last_name', 'author__post_stats__posts_count',
+    ).first()
+    return row and PageState(row[0], row)
+
+
+def scope_state(scope, queryset, *fields):
+    """Состояние ленты по времени её изменения из ScopeVersion.
+
+    Время сдвигает posts.cache.bump_scopes при любом изменении
+    постов, группы или имени автора, так что агрегировать посты
+    ленты на каждом запросе не нужно. Оно читается подзапросом
+    вместе со строкой группы или автора.
+    """
+    row = queryset.annotate(changed=Subquery(
+        ScopeVersion.objects.filter(scope=scope).values('changed')[:1]
+    )).values_list('changed', *fields).first()
+    if row is None:
+        return None
+    changed, *row = row
+    if changed is None:
+        # Лента не менялась с тех пор, как появилась ScopeVersion.
+        changed = timezone.now()
+        touch_scopes([scope], changed)
+    return PageState(changed, (changed.isoformat(), *row))
+
+
+def group_state(slug):
+    return scope_state(group_scope(slug), Group.objects.filter(slug=slug),
+                       'title', 'description')
+
+
+def author_state(username):
+    return scope_state(author_scope(username),
+                       User.objects.filter(username=username),
+                       'first_name', 'last_name', 'post_stats__posts_count')
+
+
+def conditional_page(get_state):
+    """Отвечает 304, если у клиента актуальная копия страницы.
+
+    ``get_state(**kwargs)`` одним лёгким запросом по ключу
+    возвращает PageState: время последнего изменения страницы и всё,
+    что ещё влияет на её вид, либо None, если объекта нет. Запрос
+    выполняется до основного представления и один раз на запрос.
+    Страница отличается для каждого пользователя, поэтому ETag
+    включает его id, а Last-Modified отдаётся только анонимам.
+    """
+    def state(request, **kwargs):
+        if not hasattr(request, '_page_state'):
+            page_state = get_state(**kwargs)
+            # Страница с отстающей реплики не получает валидаторов
+            # новой версии, иначе клиент закрепил бы старую копию.
+            if page_state and replica_may_lag(
+                    page_state.modified.timestamp()):
+                page_state = None
+            request._page_state = page_state
+        return request._page_state
+
+    def etag(request, *args, **kwargs):
+        page_state = state(request, **kwargs)
+        if page_state is None:
+            return None
+        validator = '{}|{}|{}'.format(
+            request.get_full_path(), request.user.pk, page_state.token)
+        return hashlib.md5(validator.encode()).hexdigest()
+
+    def last_modified(request, *args, **kwargs):
+        page_state = state(request, **kwargs)
+        if page_state is None or request.user.is_authenticated:
+            return None
+        return page_state.modified
+
+    return condition(etag_func=etag, last_modified_func=last_modified)
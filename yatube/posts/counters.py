@@ -0,0 +1,73 @@
+from django.db import connections, router, transaction
+from django.db.models import Count, F
+
+from .models import AuthorStats, Post, User
+
+
+def get_posts_count(author):
+    """Число постов автора из счётчика AuthorStats.
+
+    Если счётчика ещё нет, он заводится по честному COUNT.
+    Чтобы не делать лишний запрос, автора стоит выбирать
+    с ``select_related('post_stats')``.
+    """
+    try:
+        return author.post_stats.posts_count
+    except AuthorStats.DoesNotExist:
+        stats, _ = AuthorStats.objects.get_or_create(
+            author=author,
+            defaults={'posts_count': author.posts.count()},
+        )
+        return stats.posts_count
+
+
+def change_posts_count(author_id, delta):
+    stats = AuthorStats.objects.filter(author_id=author_id)
+    if delta < 0:
+        # Счётчик мог разойтись с таблицей после массовой вставки
+        # в обход сигналов; уходить в минус ему нельзя.
+        stats = stats.filter(posts_count__gte=-delta)
+    updated = stats.update(posts_count=F('posts_count') + delta)
+    if not updated and delta > 0:
+        # Счётчика нет: заводим его сразу с верным значением,
+        # в котором уже учтён только что сохранённый пост.
+        AuthorStats.objects.get_or_create(
+            author_id=author_id,
+            defaults={
+                'posts_count':
+                    Post.objects.filter(author_id=author_id).count(),
+            },
+        )
+
+
+def recount_posts(batch_size=None):
+    """Пересчитывает счётчики всех авторов.
+
+    Возвращает число исправленных счётчиков. Без ``batch_size`` размер
+    пачки выбирает база; больший, чем она допускает, урезается.
+    """
+    actual = dict(
+        User.objects.annotate(total=Count('posts')).values_list('id', 'total')
+    )
+    stored = dict(AuthorStats.objects.values_list('author_id', 'posts_count'))
+    to_create = [
+        AuthorStats(author_id=author_id, posts_count=total)
+        for author_id, total in actual.items()
+        if author_id not in stored
+    ]
+    to_update = [
+        AuthorStats(author_id=author_id, posts_count=actual[author_id])
+        for author_id, posts_count in stored.items()
+        if author_id in actual and actual[author_id] != posts_count
+    ]
+    # bulk_create в Django 2.2 не урезает заданный batch_size, а SQLite
+    # принимает не больше 500 строк в одном INSERT.
+    using = router.db_for_write(AuthorStats)
+    limit = connections[using].ops.bulk_batch_size(
+        AuthorStats._meta.concrete_fields, to_create)
+    batch_size = min(batch_size or limit, limit)
+    with transaction.atomic(using=using):
+        AuthorStats.objects.bulk_create(to_create, batch_size=batch_size)
+        AuthorStats.objects.bulk_update(
+            to_update, ['posts_count'], batch_size=batch_size)
+    return len(to_create) + len(to_update)
@@ -0,0 +1,104 @@
+import random
+from datetime import datetime, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.db import connections, router, transaction
+from django.utils import timezone
+
+from .cache import (GROUPS_SCOPE, INDEX_SCOPE, author_scope, bump_scopes,
+                    group_scope)
+from .counters import recount_posts
+from .models import Group, Post, User
+
+WORDS = (
+    'яндекс практикум джанго питон пост лента группа автор текст '
+    'публикация новость сегодня завтра вчера город погода кот пёс '
+    'утро вечер работа отдых книга фильм музыка спорт код тест '
+    'сервер база запрос индекс кеш страница ссылка картинка'
+).split()
+FIRST_NAMES = ('Анна', 'Борис', 'Вера', 'Глеб', 'Дарья', 'Егор', 'Жанна')
+LAST_NAMES = ('Иванов', 'Петров', 'Сидоров', 'Смирнов', 'Кузнецов')
+
+START_DATE = timezone.make_aware(datetime(2020, 1, 1))
+
+
+def insert_posts(posts):
+    """Вставляет посты как bulk_create, но с заданным pub_date.
+
+    bulk_create перезаписал бы дату текущим временем (auto_now_add),
+    а для воспроизводимого набора данных и импорта даты задаются
+    заранее. Остальные поля, включая updated и отрисованный текст,
+    готовит их pre_save, а pub_date пишется как есть. Поле модели
+    не меняется, поэтому вставлять можно из нескольких потоков.
+    """
+    opts = Post._meta
+    fields = [field for field in opts.concrete_fields
+              if field is not opts.auto_field]
+    for post in posts:
+        for field in fields:
+            if field.name != 'pub_date':
+                field.pre_save(post, add=True)
+    using = router.db_for_write(Post)
+    batch_size = connections[using].ops.bulk_batch_size(fields, posts)
+    with transaction.atomic(using=using, savepoint=False):
+        for start in range(0, len(posts), batch_size):
+            # raw=True: значения берутся из объектов без pre_save.
+            Post.objects.db_manager(using)._insert(
+                posts[start:start + batch_size], fields=fields, raw=True)
+
+
+def generate(users, groups, posts, seed=0, prefix='gen',
+             batch_size=1000, stdout=None):
+    """Создаёт детерминированный набор пользователей, групп и постов.
+
+    При одинаковых аргументах получаются одинаковые данные: имена,
+    тексты, группы и даты публикации зависят только от ``seed``.
+    """
+    rnd = random.Random(seed)
+    password = make_password(None)
+    with transaction.atomic():
+        User.objects.bulk_create(
+            (User(username=f'{prefix}_user_{number}',
+                  first_name=rnd.choice(FIRST_NAMES),
+                  last_name=rnd.choice(LAST_NAMES),
+                  password=password)
+             for number in range(users))
+        )
+        Group.objects.bulk_create(
+            (Group(title=f'Группа {number}',
+                   slug=f'{prefix}-group-{number}',
+                   description=' '.join(rnd.choices(WORDS, k=12)))
+             for number in range(groups))
+        )
+        author_ids = list(User.objects.filter(
+            username__startswith=f'{prefix}_user_'
+        ).order_by('id').values_list('id', flat=True))
+        group_ids = list(Group.objects.filter(
+            slug__startswith=f'{prefix}-group-'
+        ).order_by('id').values_list('id', flat=True))
+        # Примерно пятая часть постов публикуется без группы.
+        group_choices = group_ids + [None] * (len(group_ids) // 4 or 1)
+        batch = []
+        for number in range(posts):
+            batch.append(Post(
+                text=' '.join(rnd.choices(WORDS, k=rnd.randint(5, 80))),
+                pub_date=START_DATE + timedelta(minutes=number),
+                author_id=rnd.choice(author_ids),
+                group_id=rnd.choice(group_choices),
+            ))
+            if len(batch) == batch_size:
+                insert_posts(batch)
+                batch = []
+            if stdout is not None and (number + 1) % 100_000 == 0:
+                stdout.write(f'  постов: {number + 1}')
+        insert_posts(batch)
+    # bulk_create не отправляет сигналы: счётчики и кеши лент
+    # поправляем одним проходом.
+    recount_posts()
+    bump_scopes(
+        [INDEX_SCOPE, GROUPS_SCOPE]
+        + [group_scope(f'{prefix}-group-{number}')
+           for number in range(groups)]
+        + [author_scope(f'{prefix}_user_{number}')
+           for number in range(users)]
+    )
@@ -0,0 +1,110 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from posts.dataset import generate
+from posts.models import Post
+from posts.paginators import CursorPaginator
+from posts.views import NUMBER_OF_POSTS, feed_queryset
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает планы (EXPLAIN QUERY PLAN) и время запросов лент '
+        'с составными индексами Post и без них. Все изменения базы '
+        'выполняются в транзакции и откатываются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--posts', type=int, default=1_000_000,
+            help='До скольки постов дополнить таблицу на время замера',
+        )
+        parser.add_argument('--authors', type=int, default=1000)
+        parser.add_argument('--groups', type=int, default=100)
+        parser.add_argument(
+            '--repeat', type=int, default=20,
+            help='Сколько раз выполнять каждый запрос',
+        )
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('Замер рассчитан на бэкенд sqlite3.')
+        self.repeat = options['repeat']
+        try:
+            with transaction.atomic():
+                self.fill(options)
+                queries = self.feed_queries()
+                after = self.measure(queries, 'after')
+                self.drop_indexes()
+                before = self.measure(queries, 'before')
+                self.report(before, after)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def fill(self, options):
+        missing = options['posts'] - Post.objects.count()
+        if missing <= 0:
+            return
+        self.stdout.write(f'Добавляем {missing} постов...')
+        generate(options['authors'], options['groups'], missing,
+                 seed=options['seed'], prefix='bench')
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def feed_queries(self):
+        post_list = feed_queryset(Post.objects.all())
+        author_id, group_id = Post.objects.filter(
+            group__isnull=False).values_list('author_id', 'group_id')[0]
+        middle = Post.objects.order_by('-pub_date', '-id')[
+            Post.objects.count() // 2]
+        paginator = CursorPaginator(post_list, NUMBER_OF_POSTS)
+        return {
+            'index': post_list[:NUMBER_OF_POSTS],
+            'group': post_list.filter(group_id=group_id)[:NUMBER_OF_POSTS],
+            'profile': post_list.filter(
+                author_id=author_id)[:NUMBER_OF_POSTS],
+            'index, cursor page': paginator.filter_after(
+                middle.pub_date, middle.id)[:NUMBER_OF_POSTS + 1],
+        }
+
+    def measure(self, queries, phase):
+        results = {}
+        for name, queryset in queries.items():
+            sql, params = queryset.query.sql_with_params()
+            with connection.cursor() as cursor:
+                # Метка фазы не даёт sqlite3 взять план из кеша
+                # подготовленных запросов, составленного до DROP INDEX.
+                cursor.execute(
+                    f'EXPLAIN QUERY PLAN {sql} /* {phase} */', params)
+                plan = [row[-1] for row in cursor.fetchall()]
+            timings = []
+            for _ in range(self.repeat):
+                started = time.perf_counter()
+                list(queryset.all())
+                timings.append((time.perf_counter() - started) * 1000)
+            results[name] = (plan, statistics.median(timings))
+        return results
+
+    def drop_indexes(self):
+        with connection.cursor() as cursor:
+            for index in Post._meta.indexes:
+                cursor.execute(f'DROP INDEX "{index.name}"')
+
+    def report(self, before, after):
+        for name in after:
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            for label, results in (('без индексов', before),
+                                   ('с индексами', after)):
+                plan, median = results[name]
+                self.stdout.write(f'  {label}: медиана {median:.2f} мс')
+                for step in plan:
+                    self.stdout.write(f'    {step}')
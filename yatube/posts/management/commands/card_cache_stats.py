@@ -0,0 +1,30 @@
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.cache import card_cache_stats, reset_card_cache_stats
+
+
+class Command(BaseCommand):
+    help = 'Показывает долю попаданий в кеш карточек постов'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset', action='store_true',
+            help='Обнулить счётчики после вывода',
+        )
+
+    def handle(self, *args, **options):
+        if isinstance(caches[DEFAULT_CACHE_ALIAS], LocMemCache):
+            # Счётчики лежат в памяти процессов сайта, а у команды
+            # свой, пустой кеш.
+            raise CommandError(
+                'Кеш по умолчанию хранится в памяти процесса: смотрите '
+                'card_cache в /metrics/ работающего сайта.')
+        stats = card_cache_stats()
+        self.stdout.write(
+            'hits: {hits}, misses: {misses}, hit ratio: {hit_ratio:.2%}'
+            .format(**stats)
+        )
+        if options['reset']:
+            reset_card_cache_stats()
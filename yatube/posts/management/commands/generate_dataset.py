@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts.dataset import generate
+
+
+class Command(BaseCommand):
+    help = (
+        'Детерминированно создаёт пользователей, группы и посты '
+        'пакетными вставками'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--groups', type=int, default=10)
+        parser.add_argument('--posts', type=int, default=10_000)
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Одинаковый seed даёт одинаковый набор данных',
+        )
+        parser.add_argument(
+            '--prefix', default='gen',
+            help='Префикс имён пользователей и слагов групп',
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        generate(
+            options['users'], options['groups'], options['posts'],
+            seed=options['seed'], prefix=options['prefix'],
+            batch_size=options['batch_size'], stdout=self.stdout,
+        )
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"Создано: пользователей {options['users']}, "
+            f"групп {options['groups']}, постов {options['posts']} "
+            f"за {elapsed:.1f} с"
+        )
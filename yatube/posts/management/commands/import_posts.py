@@ -0,0 +1,249 @@
+import csv
+import json
+import os
+import time
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from posts.cache import (GROUPS_SCOPE, INDEX_SCOPE, author_scope,
+                         bump_scopes, group_scope)
+from posts.counters import recount_posts
+from posts.dataset import insert_posts
+from posts.models import Group, Post, User
+
+EMPTY_CHECKPOINT = {'offset': 0, 'rows': 0, 'scopes': []}
+
+
+def string_values(rows, key):
+    return {row[key] for row in rows if isinstance(row.get(key), str)}
+
+
+def parse_pub_date(value, default):
+    """Дата из строки ISO 8601; пустая строка — ``default``,
+    нераспознанная — None.
+    """
+    if not value:
+        return default
+    try:
+        pub_date = parse_datetime(value)
+    except ValueError:
+        return None
+    if pub_date is not None and timezone.is_naive(pub_date):
+        pub_date = timezone.make_aware(pub_date)
+    return pub_date
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоково импортирует посты из JSONL или CSV. Каждая строка: '
+        'text, author (username), group (slug, необязательно), '
+        'pub_date (ISO 8601, необязательно).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument(
+            '--format', choices=('jsonl', 'csv'),
+            help='По умолчанию определяется по расширению файла',
+        )
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument(
+            '--checkpoint',
+            help='Файл с позицией в исходном файле и затронутыми лентами '
+                 '(по умолчанию <path>.checkpoint)',
+        )
+        parser.add_argument(
+            '--restart', action='store_true',
+            help='Игнорировать сохранённую позицию и начать с начала',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or (
+            'csv' if path.endswith('.csv') else 'jsonl')
+        checkpoint = options['checkpoint'] or f'{path}.checkpoint'
+        state = (EMPTY_CHECKPOINT if options['restart']
+                 else self.read_checkpoint(checkpoint))
+        done = state['rows']
+        self.authors = {}
+        self.groups = {}
+        # Ленты, затронутые до сбоя, хранятся в контрольной точке:
+        # их кеш сбрасывается вместе с остальными в конце импорта.
+        self.touched_scopes = {INDEX_SCOPE, GROUPS_SCOPE, *state['scopes']}
+        imported = skipped = 0
+        started = time.perf_counter()
+        try:
+            source = open(path, 'rb')
+        except OSError as error:
+            raise CommandError(error)
+        with source:
+            if done:
+                self.stdout.write(f'Продолжаем со строки {done + 1}')
+            rows = self.read_rows(source, file_format, state['offset'])
+            while True:
+                chunk = list(islice(rows, options['chunk_size']))
+                if not chunk:
+                    break
+                with transaction.atomic():
+                    posts, rejected = self.build_posts(chunk, done)
+                    insert_posts(posts)
+                done += len(chunk)
+                imported += len(posts)
+                skipped += rejected
+                self.write_checkpoint(checkpoint, {
+                    'offset': chunk[-1][1],
+                    'rows': done,
+                    'scopes': sorted(self.touched_scopes),
+                })
+                elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f'  строк: {done}, импортировано: {imported}, '
+                    f'{imported / elapsed:.0f} строк/с'
+                )
+        # bulk-вставка не отправляет сигналы: счётчики авторов и кеши
+        # затронутых лент поправляем после импорта.
+        recount_posts()
+        bump_scopes(self.touched_scopes)
+        if os.path.exists(checkpoint):
+            os.remove(checkpoint)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Импортировано {imported} постов, пропущено {skipped} строк '
+            f'за {elapsed:.1f} с ({imported / (elapsed or 1):.0f} строк/с)'
+        ))
+
+    def read_rows(self, source, file_format, offset):
+        """Строки файла, начиная с байта ``offset``.
+
+        Отдаёт пары (строка, смещение конца строки в байтах). Вместо
+        строки, которую не удалось разобрать, отдаётся причина.
+        Продолжение после сбоя начинается с seek() и не разбирает
+        уже импортированную часть файла.
+        """
+        if file_format == 'csv':
+            yield from self.csv_rows(source, offset)
+            return
+        source.seek(offset)
+        for line, end in self.read_lines(source):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as error:
+                yield f'некорректный JSON: {error}', end
+                continue
+            if not isinstance(row, dict):
+                row = 'строка не является объектом'
+            yield row, end
+
+    def csv_rows(self, source, offset):
+        fieldnames = next(csv.reader(
+            [source.readline().decode('utf-8-sig', errors='replace')]), [])
+        source.seek(max(offset, source.tell()))
+        position = [source.tell()]
+
+        def lines():
+            for line, end in self.read_lines(source):
+                position[0] = end
+                yield line.decode('utf-8', errors='replace')
+
+        reader = csv.reader(lines())
+        while True:
+            try:
+                values = next(reader)
+            except StopIteration:
+                return
+            except csv.Error as error:
+                yield f'некорректная строка CSV: {error}', position[0]
+                continue
+            if values:
+                yield dict(zip(fieldnames, values)), position[0]
+
+    def read_lines(self, source):
+        for line in iter(source.readline, b''):
+            yield line, source.tell()
+
+    def build_posts(self, chunk, offset):
+        rows = [row for row, _ in chunk if isinstance(row, dict)]
+        self.resolve(self.authors, User, 'username',
+                     string_values(rows, 'author'))
+        self.resolve(self.groups, Group, 'slug',
+                     string_values(rows, 'group'))
+        posts = []
+        rejected = 0
+        now = timezone.now()
+        for number, (row, _) in enumerate(chunk, start=offset + 1):
+            if not isinstance(row, dict):
+                self.stderr.write(f'Строка {number} пропущена: {row}')
+                rejected += 1
+                continue
+            post = self.build_post(row, now)
+            if isinstance(post, str):
+                self.stderr.write(
+                    f'Строка {number} пропущена ({post}): {row}')
+                rejected += 1
+                continue
+            posts.append(post)
+        return posts, rejected
+
+    def build_post(self, row, now):
+        """Пост из строки файла или причина, по которой строка пропущена."""
+        for field in ('text', 'author', 'group', 'pub_date'):
+            if not isinstance(row.get(field) or '', str):
+                return f'{field} должно быть строкой'
+        author_id = self.authors.get(row.get('author'))
+        group_slug = row.get('group') or None
+        group_id = self.groups.get(group_slug)
+        if not row.get('text'):
+            return 'нет текста'
+        if author_id is None:
+            return 'неизвестный автор'
+        if group_slug and group_id is None:
+            return 'неизвестная группа'
+        pub_date = parse_pub_date(row.get('pub_date'), now)
+        if pub_date is None:
+            return 'некорректная pub_date'
+        self.touched_scopes.add(author_scope(row['author']))
+        if group_slug:
+            self.touched_scopes.add(group_scope(group_slug))
+        return Post(text=row['text'], author_id=author_id,
+                    group_id=group_id, pub_date=pub_date)
+
+    def resolve(self, lookup, model, field, keys):
+        """Дополняет словарь ключ -> id теми ключами, которых в нём нет.
+
+        В памяти держатся только авторы и группы, а не посты,
+        поэтому расход памяти не зависит от размера файла.
+        """
+        missing = {key for key in keys if key and key not in lookup}
+        if not missing:
+            return
+        found = dict(model.objects.filter(
+            **{f'{field}__in': missing}).values_list(field, 'id'))
+        # Ненайденные ключи тоже запоминаются, чтобы не искать
+        # их заново в каждой порции.
+        lookup.update({key: found.get(key) for key in missing})
+
+    def read_checkpoint(self, checkpoint):
+        try:
+            with open(checkpoint) as file:
+                state = json.load(file)
+        except FileNotFoundError:
+            return EMPTY_CHECKPOINT
+        except ValueError:
+            state = None
+        if not isinstance(state, dict) or set(state) != set(EMPTY_CHECKPOINT):
+            raise CommandError(
+                f'Не удалось прочитать {checkpoint}: запустите импорт '
+                f'с --restart')
+        return state
+
+    def write_checkpoint(self, checkpoint, state):
+        temporary = f'{checkpoint}.tmp'
+        with open(temporary, 'w') as file:
+            json.dump(state, file)
+        os.replace(temporary, checkpoint)
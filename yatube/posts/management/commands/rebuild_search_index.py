@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.search import fts_enabled, install_triggers, rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает полнотекстовый индекс постов'
+
+    def handle(self, *args, **options):
+        if not fts_enabled():
+            raise CommandError('Полнотекстовый индекс есть только в SQLite.')
+        install_triggers()
+        rebuild_index()
+        self.stdout.write('Поисковый индекс перестроен')
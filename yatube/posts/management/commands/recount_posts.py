@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from posts.counters import recount_posts
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает и исправляет счётчики постов авторов'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int,
+            help='Сколько счётчиков записывать за один запрос '
+                 '(по умолчанию — сколько допускает база)',
+        )
+
+    def handle(self, *args, **options):
+        repaired = recount_posts(batch_size=options['batch_size'])
+        self.stdout.write(f'Исправлено счётчиков: {repaired}')
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from posts.rendering import RENDERER_VERSION, rerender_posts
+
+
+class Command(BaseCommand):
+    help = (
+        'Перерисовывает сохранённый HTML постов, отрисованных '
+        'прежней версией рендерера'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all', action='store_true', dest='force',
+            help='Перерисовать все посты, а не только устаревшие',
+        )
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        done = rerender_posts(
+            force=options['force'], chunk_size=options['chunk_size'])
+        self.stdout.write(
+            f'Перерисовано постов: {done} (версия {RENDERER_VERSION})')
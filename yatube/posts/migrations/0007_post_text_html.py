@@ -0,0 +1,41 @@
+from django.db import migrations, models
+from django.utils.html import linebreaks
+
+import posts.rendering
+
+
+def render_existing(apps, schema_editor):
+    # Копия render_text версии 1: миграция не должна зависеть
+    # от того, как рендерер изменится потом.
+    Post = apps.get_model('posts', 'Post')
+    batch = []
+    for post in Post.objects.only('id', 'text').iterator(chunk_size=1000):
+        post.text_html = linebreaks(post.text, autoescape=True)
+        post.text_html_version = 1
+        batch.append(post)
+        if len(batch) == 1000:
+            Post.objects.bulk_update(
+                batch, ['text_html', 'text_html_version'])
+            batch = []
+    Post.objects.bulk_update(batch, ['text_html', 'text_html_version'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0006_post_updated'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='text_html',
+            field=posts.rendering.RenderedTextField(blank=True, editable=False, source='text', verbose_name='HTML поста', version_field='text_html_version'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='text_html_version',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, verbose_name='Версия рендеринга HTML'),
+        ),
+        migrations.RunPython(render_existing, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,47 @@
+from django.db import migrations, models
+from django.utils.html import linebreaks
+from django.utils.text import Truncator
+
+import posts.rendering
+
+
+def fill_excerpts(apps, schema_editor):
+    # Копия make_excerpt и render_text версии 1.
+    Post = apps.get_model('posts', 'Post')
+    fields = ['excerpt', 'excerpt_html', 'is_truncated']
+    batch = []
+    for post in Post.objects.only('id', 'text').iterator(chunk_size=1000):
+        post.excerpt = Truncator(post.text).chars(300)
+        post.excerpt_html = linebreaks(post.excerpt, autoescape=True)
+        post.is_truncated = post.excerpt != post.text
+        batch.append(post)
+        if len(batch) == 1000:
+            Post.objects.bulk_update(batch, fields)
+            batch = []
+    Post.objects.bulk_update(batch, fields)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0007_post_text_html'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=posts.rendering.ExcerptField(blank=True, editable=False, max_length=300, source='text', truncated_field='is_truncated', verbose_name='Анонс'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='excerpt_html',
+            field=posts.rendering.RenderedTextField(blank=True, editable=False, source='excerpt', verbose_name='HTML анонса'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='is_truncated',
+            field=models.BooleanField(default=False, editable=False, verbose_name='Текст длиннее анонса'),
+        ),
+        migrations.RunPython(fill_excerpts, migrations.RunPython.noop),
+    ]
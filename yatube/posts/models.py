@@ -1,6 +1,8 @@
 from django.db import models
 from django.contrib.auth import get_user_model
 
+from .rendering import ExcerptField, RenderedTextField
+
 
 User = get_user_model()
 
@@ -24,10 +26,40 @@ class Post(models.Model):
         'Текст поста',
         help_text='Введите текст поста',
     )
+    text_html = RenderedTextField(
+        'HTML поста',
+        source='text',
+        version_field='text_html_version',
+    )
+    text_html_version = models.PositiveSmallIntegerField(
+        'Версия рендеринга HTML',
+        default=0,
+        editable=False,
+    )
+    # Списки постов читают только анонс, а полный текст —
+    # страница поста.
+    excerpt = ExcerptField(
+        'Анонс',
+        source='text',
+        truncated_field='is_truncated',
+    )
+    excerpt_html = RenderedTextField(
+        'HTML анонса',
+        source='excerpt',
+    )
+    is_truncated = models.BooleanField(
+        'Текст длиннее анонса',
+        default=False,
+        editable=False,
+    )
     pub_date = models.DateTimeField(
         'Дата публикации',
         auto_now_add=True,
     )
+    updated = models.DateTimeField(
+        'Дата изменения',
+        auto_now=True,
+    )
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -46,6 +78,74 @@ class Post(models.Model):
 
     class Meta:
         ordering = ['-pub_date']
+        indexes = [
+            models.Index(
+                fields=['author', 'pub_date'],
+                name='post_author_pub_date_idx',
+            ),
+            models.Index(
+                fields=['group', 'pub_date'],
+                name='post_group_pub_date_idx',
+            ),
+            models.Index(
+                fields=['pub_date', 'id'],
+                name='post_pub_date_id_idx',
+            ),
+            models.Index(
+                fields=['author', 'updated'],
+                name='post_author_updated_idx',
+            ),
+            models.Index(
+                fields=['group', 'updated'],
+                name='post_group_updated_idx',
+            ),
+        ]
+
+    def __str__(self):
+        # Анонс начинается с тех же символов, что и текст, но в
+        # списках полный текст не загружается. У несохранённого поста
+        # анонса ещё нет.
+        return (self.excerpt or self.text)[:15]
+
+
+# Крупные поля, которые не нужны спискам постов.
+FULL_TEXT_FIELDS = ('text', 'text_html')
+
+
+class AuthorStats(models.Model):
+    author = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='post_stats',
+        verbose_name='Автор',
+    )
+    posts_count = models.PositiveIntegerField(
+        'Число постов',
+        default=0,
+    )
+
+    class Meta:
+        verbose_name = 'Статистика автора'
+        verbose_name_plural = 'Статистика авторов'
+
+    def __str__(self):
+        return f'{self.author}: {self.posts_count}'
+
+
+class ScopeVersion(models.Model):
+    """Время последнего изменения ленты: группы, автора, главной.
+
+    Ленты сбрасывает posts.cache.bump_scopes. Валидаторы страниц
+    берут время отсюда, а не из кеша: в кеше каждого процесса
+    может лежать своя версия.
+    """
+    scope = models.CharField('Лента', max_length=255, primary_key=True)
+    changed = models.DateTimeField('Изменена')
+
+    class Meta:
+        verbose_name = 'Версия ленты'
+        verbose_name_plural = 'Версии лент'
 
     def __str__(self):
-        return self.text[:15]
+        return self.scope
@@ -0,0 +1,245 @@
+import binascii
+from datetime import datetime
+
+from django.core.paginator import Page, Paginator
+from django.utils.functional import cached_property
+from django.utils.dateparse import parse_datetime
+from django.utils.encoding import force_str
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+
+
+def encode_cursor(pub_date: datetime, pk: int) -> str:
+    """Упаковывает позицию (pub_date, id) в непрозрачный токен."""
+    raw = f'{pub_date.isoformat()}|{pk}'
+    return urlsafe_base64_encode(raw.encode())
+
+
+def decode_cursor(token: str):
+    """Распаковывает токен; для битого токена возвращает None."""
+    try:
+        pub_date, pk = force_str(urlsafe_base64_decode(token)).split('|')
+        pub_date = parse_datetime(pub_date)
+        pk = int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+        return None
+    if pub_date is None:
+        return None
+    return pub_date, pk
+
+
+PAGE_WINDOW: int = 2
+
+# Дальше этой страницы ленты ссылки ведут по курсору, а не ?page=N:
+# глубокий OFFSET перебирает все пропущенные строки.
+NUMBERED_PAGES: int = 5
+
+# Курсор ?before=last открывает последнюю страницу без OFFSET.
+LAST_PAGE = 'last'
+
+
+class FeedPage(Page):
+    """Нумерованная страница ленты с окном ссылок на соседние."""
+
+    @property
+    def page_window(self):
+        """Номера страниц не дальше PAGE_WINDOW от текущей.
+
+        Сколько бы ни было страниц, шаблон выводит не больше
+        2 * PAGE_WINDOW + 1 ссылок, а в ленте с курсорами — только
+        на первые NUMBERED_PAGES страниц. Текущая страница есть в окне
+        всегда: на ?page=N дальше NUMBERED_PAGES ведут старые ссылки.
+        """
+        first = max(1, self.number - PAGE_WINDOW)
+        last = min(self.paginator.num_pages, self.number + PAGE_WINDOW)
+        return [
+            number for number in range(first, last + 1)
+            if not self.uses_cursor(number) or number == self.number
+        ]
+
+    def uses_cursor(self, number):
+        return self.paginator.cursor_links and number > NUMBERED_PAGES
+
+    @property
+    def next_query(self):
+        """Параметр ссылки «Следующая»: номер страницы или курсор
+        от последнего поста текущей.
+        """
+        number = self.next_page_number()
+        if self.uses_cursor(number):
+            return 'after=' + encode_cursor(
+                *CursorPaginator.position(self[-1]))
+        return f'page={number}'
+
+    @property
+    def previous_query(self):
+        number = self.previous_page_number()
+        if self.uses_cursor(number):
+            return 'before=' + encode_cursor(
+                *CursorPaginator.position(self[0]))
+        return f'page={number}'
+
+    @property
+    def last_query(self):
+        if self.uses_cursor(self.paginator.num_pages):
+            return f'before={LAST_PAGE}'
+        return f'page={self.paginator.num_pages}'
+
+
+class FeedPaginator(Paginator):
+    """Paginator, которому можно передать заранее известное число
+    объектов, чтобы не выполнять COUNT(*).
+    """
+
+    def __init__(self, object_list, per_page, count=None,
+                 cursor_links=False, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self._known_count = count
+        # Лента упорядочена по (pub_date, id), и дальние страницы
+        # можно открывать курсором CursorPaginator.
+        self.cursor_links = cursor_links
+
+    @cached_property
+    def count(self):
+        if self._known_count is None:
+            return super().count
+        if callable(self._known_count):
+            return self._known_count()
+        return self._known_count
+
+    def page(self, number):
+        if self._known_count is None:
+            return super().page(number)
+        # Переданное число может отставать от таблицы, поэтому страница
+        # не обрезается по нему: от него зависят только ссылки.
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        top = bottom + self.per_page
+        return self._get_page(self.object_list[bottom:top], number, self)
+
+    def _get_page(self, *args, **kwargs):
+        return FeedPage(*args, **kwargs)
+
+
+class CursorPage(Page):
+    """Страница ленты, адресуемая курсором вместо номера."""
+
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        super().__init__(object_list, None, paginator)
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self):
+        return f'<CursorPage of {len(self.object_list)} posts>'
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    @property
+    def next_cursor(self):
+        if not self._has_next:
+            return None
+        return self.paginator.cursor_for(self.object_list[-1])
+
+    @property
+    def previous_cursor(self):
+        if not self._has_previous:
+            return None
+        return self.paginator.cursor_for(self.object_list[0])
+
+
+class CursorPaginator(Paginator):
+    """Пагинатор по ключу (pub_date, id).
+
+    Страница выбирается условием по ключу, а не LIMIT/OFFSET,
+    поэтому глубина страницы не влияет на стоимость запроса,
+    а COUNT(*) не выполняется вовсе.
+    """
+    is_cursor = True
+    ordering = ('-pub_date', '-id')
+
+    def __init__(self, object_list, per_page, **kwargs):
+        super().__init__(object_list.order_by(*self.ordering),
+                         per_page, **kwargs)
+
+    @staticmethod
+    def position(obj):
+        if isinstance(obj, dict):
+            return obj['pub_date'], obj['id']
+        return obj.pub_date, obj.pk
+
+    def cursor_for(self, obj):
+        return encode_cursor(*self.position(obj))
+
+    def _slice(self, queryset):
+        return list(queryset[:self.per_page + 1])
+
+    # Условие записано как диапазон по pub_date с исключением
+    # границы, а не как OR: так SQLite идёт по индексу (pub_date, id),
+    # а не перебирает строки.
+    def filter_after(self, pub_date, pk):
+        return self.object_list.filter(pub_date__lte=pub_date).exclude(
+            pub_date=pub_date, id__gte=pk)
+
+    def filter_before(self, pub_date, pk):
+        return self.object_list.filter(pub_date__gte=pub_date).exclude(
+            pub_date=pub_date, id__lte=pk)
+
+    def first_page(self):
+        rows = self._slice(self.object_list)
+        return CursorPage(rows[:self.per_page], self,
+                          has_next=len(rows) > self.per_page,
+                          has_previous=False)
+
+    def page_after(self, token):
+        position = decode_cursor(token)
+        if position is None:
+            return self.first_page()
+        rows = self._slice(self.filter_after(*position))
+        return CursorPage(rows[:self.per_page], self,
+                          has_next=len(rows) > self.per_page,
+                          has_previous=True)
+
+    def page_before(self, token):
+        if token == LAST_PAGE:
+            queryset = self.object_list
+        else:
+            position = decode_cursor(token)
+            if position is None:
+                return self.first_page()
+            queryset = self.filter_before(*position)
+        rows = self._slice(queryset.reverse())
+        has_previous = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        rows.reverse()
+        return CursorPage(rows, self,
+                          has_next=token != LAST_PAGE,
+                          has_previous=has_previous)
+
+    def get_cursor_page(self, after=None, before=None):
+        if after:
+            return self.page_after(after)
+        if before:
+            return self.page_before(before)
+        return self.first_page()
+
+
+def paginate(request, queryset, per_page, count=None):
+    """Возвращает страницу ленты для запроса.
+
+    Если в запросе есть курсор ``after``/``before``, используется
+    CursorPaginator, иначе — обычная нумерованная пагинация ``?page=N``.
+    ``count`` — известное число постов в ленте или функция, которая
+    его вернёт; без него число считается через COUNT(*). Ссылки
+    дальше NUMBERED_PAGES страниц ведут по курсору.
+    """
+    after = request.GET.get('after')
+    before = request.GET.get('before')
+    if after or before:
+        paginator = CursorPaginator(queryset, per_page)
+        return paginator.get_cursor_page(after=after, before=before)
+    paginator = FeedPaginator(queryset, per_page, count=count,
+                              cursor_links=True)
+    return paginator.get_page(request.GET.get('page'))
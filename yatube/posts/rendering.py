@@ -0,0 +1,144 @@
+from django.apps import apps
+from django.db import models
+from django.utils import timezone
+from django.utils.html import linebreaks
+from django.utils.text import Truncator
+
+from .cache import (GROUPS_SCOPE, INDEX_SCOPE, author_scope,
+                    bump_post_versions, bump_scopes, group_scope)
+
+# Увеличивается при любом изменении render_text: посты со старой
+# версией перерисовывает команда rerender_posts.
+RENDERER_VERSION = 1
+
+# Длина анонса в символах, включая многоточие.
+EXCERPT_LENGTH = 300
+
+
+def render_text(text):
+    """HTML поста: текст экранируется, абзацы и переносы строк
+    превращаются в <p> и <br>.
+    """
+    return linebreaks(text, autoescape=True)
+
+
+def make_excerpt(text):
+    """Анонс поста и признак того, что текст в него не поместился."""
+    excerpt = Truncator(text).chars(EXCERPT_LENGTH)
+    return excerpt, excerpt != text
+
+
+class ExcerptField(models.CharField):
+    """Начало текстового поля, которое считается при записи.
+
+    Как и RenderedTextField, заполняется в pre_save, в том числе при
+    bulk_create. Поле-признак ``truncated_field`` должно идти
+    в модели после этого поля.
+    """
+
+    def __init__(self, *args, source='text', truncated_field=None,
+                 **kwargs):
+        self.source = source
+        self.truncated_field = truncated_field
+        kwargs.setdefault('max_length', EXCERPT_LENGTH)
+        kwargs.setdefault('editable', False)
+        kwargs.setdefault('blank', True)
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        kwargs['source'] = self.source
+        if self.truncated_field:
+            kwargs['truncated_field'] = self.truncated_field
+        return name, path, args, kwargs
+
+    def pre_save(self, model_instance, add):
+        value, truncated = make_excerpt(getattr(model_instance, self.source))
+        setattr(model_instance, self.attname, value)
+        if self.truncated_field:
+            setattr(model_instance, self.truncated_field, truncated)
+        return value
+
+
+def computed_fields(model):
+    """Поля модели, которые считаются из других полей при записи."""
+    return [field for field in model._meta.concrete_fields
+            if isinstance(field, (RenderedTextField, ExcerptField))]
+
+
+class RenderedTextField(models.TextField):
+    """HTML-версия текстового поля, которая считается при записи.
+
+    pre_save вызывается и при save(), и при bulk_create, поэтому
+    HTML не бывает пустым ни у созданных формой постов, ни у
+    импортированных. Поле версии ``version_field`` должно идти в
+    модели после этого поля: его значение проставляется здесь.
+    """
+
+    def __init__(self, *args, source='text', version_field=None, **kwargs):
+        self.source = source
+        self.version_field = version_field
+        kwargs.setdefault('editable', False)
+        kwargs.setdefault('blank', True)
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        kwargs['source'] = self.source
+        if self.version_field:
+            kwargs['version_field'] = self.version_field
+        return name, path, args, kwargs
+
+    def pre_save(self, model_instance, add):
+        value = render_text(getattr(model_instance, self.source))
+        setattr(model_instance, self.attname, value)
+        if self.version_field:
+            setattr(model_instance, self.version_field, RENDERER_VERSION)
+        return value
+
+
+def rerender_posts(force=False, chunk_size=1000):
+    """Перерисовывает HTML и анонсы постов, отрисованных старым
+    рендерером.
+
+    Посты обходятся порциями по возрастанию id; bulk_update не
+    отправляет сигналы и не трогает auto_now, поэтому кеш карточек
+    и лент сбрасывается, а ``updated`` (от него зависят ETag и
+    Last-Modified) сдвигается здесь же. Возвращает число
+    перерисованных постов.
+    """
+    Post = apps.get_model('posts', 'Post')
+    fields = computed_fields(Post)
+    # Поля вроде is_truncated и text_html_version проставляются
+    # в pre_save вычисляемых полей и тоже записываются.
+    update_fields = [field.name for field in fields] + [
+        name for field in fields for name in (
+            getattr(field, 'version_field', None),
+            getattr(field, 'truncated_field', None),
+        ) if name
+    ] + ['updated']
+    posts = Post.objects.order_by('id').only(
+        'id', 'text', 'author__username', 'group__slug',
+    ).select_related('author', 'group')
+    if not force:
+        posts = posts.filter(text_html_version__lt=RENDERER_VERSION)
+    scopes = {INDEX_SCOPE}
+    done = last_id = 0
+    while True:
+        chunk = list(posts.filter(id__gt=last_id)[:chunk_size])
+        if not chunk:
+            break
+        now = timezone.now()
+        for post in chunk:
+            post.updated = now
+            for field in fields:
+                field.pre_save(post, add=False)
+            scopes.add(author_scope(post.author.username))
+            if post.group_id:
+                scopes |= {group_scope(post.group.slug), GROUPS_SCOPE}
+        Post.objects.bulk_update(chunk, sorted(set(update_fields)))
+        bump_post_versions(post.id for post in chunk)
+        done += len(chunk)
+        last_id = chunk[-1].id
+    bump_scopes(scopes)
+    return done
@@ -0,0 +1,103 @@
+from contextvars import ContextVar
+
+from django.contrib.auth import get_user_model
+from django.db.models.signals import (post_delete, post_save, pre_delete,
+                                      pre_save)
+from django.dispatch import receiver
+
+from .cache import (GROUPS_SCOPE, INDEX_SCOPE, author_scope,
+                    bump_author_version, bump_post_version, bump_scopes,
+                    group_scope)
+from .counters import change_posts_count
+from .models import Group, Post
+
+User = get_user_model()
+
+AUTHOR_NAME_FIELDS = frozenset(('username', 'first_name', 'last_name'))
+
+# Авторы, которых удаляют вместе с постами: их ленты сбрасываются
+# один раз в author_deleted, а не на каждом удалённом посте.
+deleting_authors = ContextVar('deleting_authors', default=frozenset())
+
+
+def feed_scopes(author_username, group_slug):
+    """Ленты, в которых виден пост данного автора и группы."""
+    scopes = {INDEX_SCOPE, author_scope(author_username)}
+    if group_slug:
+        scopes |= {group_scope(group_slug), GROUPS_SCOPE}
+    return scopes
+
+
+def post_scopes(post):
+    group_slug = post.group.slug if post.group_id else None
+    return feed_scopes(post.author.username, group_slug)
+
+
+@receiver(pre_save, sender=Post)
+def remember_previous_scopes(sender, instance, **kwargs):
+    # При правке пост может уйти из прежней группы: её ленту
+    # тоже нужно сбросить.
+    instance._previous_scopes = set()
+    instance._previous_author_id = None
+    if instance.pk is None:
+        return
+    previous = Post.objects.filter(pk=instance.pk).values_list(
+        'author_id', 'author__username', 'group__slug').first()
+    if previous is not None:
+        instance._previous_author_id = previous[0]
+        instance._previous_scopes = feed_scopes(*previous[1:])
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, **kwargs):
+    bump_post_version(instance.id)
+    previous_author_id = getattr(instance, '_previous_author_id', None)
+    if created:
+        change_posts_count(instance.author_id, 1)
+    elif previous_author_id not in (None, instance.author_id):
+        change_posts_count(previous_author_id, -1)
+        change_posts_count(instance.author_id, 1)
+    previous = getattr(instance, '_previous_scopes', set())
+    bump_scopes(post_scopes(instance) | previous)
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    if instance.author_id in deleting_authors.get():
+        return
+    change_posts_count(instance.author_id, -1)
+    bump_scopes(post_scopes(instance))
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def group_changed(sender, instance, **kwargs):
+    bump_scopes([group_scope(instance.slug), GROUPS_SCOPE])
+
+
+@receiver(post_save, sender=User)
+def author_saved(sender, instance, update_fields=None, **kwargs):
+    # Вход пользователя сохраняет только last_login: карточки не меняются.
+    if update_fields and not AUTHOR_NAME_FIELDS & set(update_fields):
+        return
+    bump_author_version(instance.id)
+    bump_scopes([author_scope(instance.username)])
+
+
+@receiver(pre_delete, sender=User)
+def author_deleting(sender, instance, **kwargs):
+    # Посты автора удалятся каскадом вместе со счётчиком: ленты, где
+    # они были, собираются одним запросом до удаления.
+    group_slugs = Group.objects.filter(posts__author=instance).values_list(
+        'slug', flat=True).distinct()
+    instance._feed_scopes = set().union(
+        feed_scopes(instance.username, None),
+        *(feed_scopes(instance.username, slug) for slug in group_slugs))
+    deleting_authors.set(deleting_authors.get() | {instance.pk})
+
+
+@receiver(post_delete, sender=User)
+def author_deleted(sender, instance, **kwargs):
+    deleting_authors.set(deleting_authors.get() - {instance.pk})
+    bump_author_version(instance.id)
+    bump_scopes(instance._feed_scopes)
@@ -0,0 +1,155 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..cache import card_cache_stats, render_cards
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+class PostCardCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='MikeyMouse')
+        cls.post = Post.objects.create(
+            author=cls.user,
+            text='Текст тестового поста',
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.author_client = Client()
+        self.author_client.force_login(self.user)
+
+    def get_card(self):
+        post = Post.objects.select_related('author').get(id=self.post.id)
+        return render_cards([post])[0].card_html
+
+    def test_card_rendered_once(self):
+        """Повторная карточка берётся из кеша."""
+        first = self.get_card()
+        second = self.get_card()
+        self.assertEqual(first, second)
+        stats = card_cache_stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+        self.assertEqual(stats['hit_ratio'], 0.5)
+
+    def test_post_edit_invalidates_card(self):
+        """Правка поста через post_edit сбрасывает его карточку."""
+        self.get_card()
+        self.author_client.post(
+            reverse('posts:post_edit', kwargs={'post_id': self.post.id}),
+            data={'text': 'Изменённый текст'},
+        )
+        self.assertIn('Изменённый текст', self.get_card())
+
+    def test_author_rename_invalidates_card(self):
+        """Смена имени автора сбрасывает карточки его постов."""
+        self.get_card()
+        self.user.first_name = 'Mikey'
+        self.user.last_name = 'Mouse'
+        self.user.save()
+        self.assertIn('Mikey Mouse', self.get_card())
+
+    def test_login_keeps_card(self):
+        """Обновление last_login не сбрасывает карточки."""
+        self.get_card()
+        self.user.save(update_fields=['last_login'])
+        self.get_card()
+        self.assertEqual(card_cache_stats()['hits'], 1)
+
+
+class AnonymousPageCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='MikeyMouse')
+        cls.other_user = User.objects.create_user(username='SpiderMan')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='mouses',
+            description='Тестовое описание группы',
+        )
+        cls.other_group = Group.objects.create(
+            title='Другая группа',
+            slug='presidents',
+            description='Описание другой группы',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user,
+            text='Текст тестового поста',
+            group=cls.group,
+        )
+        cls.index_url = reverse('posts:index')
+        cls.group_url = reverse(
+            'posts:group_posts', kwargs={'slug': cls.group.slug})
+        cls.other_group_url = reverse(
+            'posts:group_posts', kwargs={'slug': cls.other_group.slug})
+        cls.profile_url = reverse(
+            'posts:profile', kwargs={'username': cls.user.username})
+        cls.other_profile_url = reverse(
+            'posts:profile', kwargs={'username': cls.other_user.username})
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.author_client = Client()
+        self.author_client.force_login(self.user)
+
+    def assertServedFromCache(self, url, cached=True):
+        response = self.guest_client.get(url)
+        self.assertEqual(response.status_code, 200)
+        if cached:
+            self.assertIsNone(response.context)
+        else:
+            self.assertIsNotNone(response.context)
+
+    def test_anonymous_page_cached(self):
+        """Анонимный посетитель получает ленту из кеша без запросов к БД,
+        авторизованный — всегда свежую.
+        """
+        self.guest_client.get(self.index_url)
+        with self.assertNumQueries(0):
+            self.assertServedFromCache(self.index_url)
+        response = self.author_client.get(self.index_url)
+        self.assertIsNotNone(response.context)
+
+    def test_new_post_drops_only_affected_feeds(self):
+        """Новый пост сбрасывает главную, ленту своей группы и профиль
+        автора, не трогая остальные ленты.
+        """
+        urls = (self.index_url, self.group_url, self.other_group_url,
+                self.profile_url, self.other_profile_url)
+        for url in urls:
+            self.guest_client.get(url)
+        Post.objects.create(
+            author=self.user, text='Новый пост', group=self.group)
+        for url, cached in zip(urls, (False, False, True, False, True)):
+            with self.subTest(url=url):
+                self.assertServedFromCache(url, cached)
+
+    def test_moved_post_drops_previous_group(self):
+        """Перенос поста в другую группу сбрасывает обе ленты групп."""
+        self.guest_client.get(self.group_url)
+        self.guest_client.get(self.other_group_url)
+        self.author_client.post(
+            reverse('posts:post_edit', kwargs={'post_id': self.post.id}),
+            data={'text': self.post.text, 'group': self.other_group.id},
+        )
+        self.assertServedFromCache(self.group_url, cached=False)
+        self.assertServedFromCache(self.other_group_url, cached=False)
+
+    def test_deleted_post_drops_feeds(self):
+        """Удаление поста сбрасывает главную страницу."""
+        self.guest_client.get(self.index_url)
+        Post.objects.create(author=self.other_user, text='Удаляемый').delete()
+        self.assertServedFromCache(self.index_url, cached=False)
+
+    def test_stats_command_needs_shared_cache(self):
+        """С кешем в памяти процесса команда не выдаёт пустые нули."""
+        with self.assertRaisesMessage(CommandError, '/metrics/'):
+            call_command('card_cache_stats')
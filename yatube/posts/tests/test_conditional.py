@@ -0,0 +1,112 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..cache import author_scope, group_scope, scope_version_key
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='MikeyMouse')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='mouses',
+            description='Тестовое описание группы',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user, group=cls.group, text='Тестовый пост')
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.author_client = Client()
+        self.author_client.force_login(self.user)
+        self.urls = (
+            reverse('posts:post_detail', kwargs={'post_id': self.post.id}),
+            reverse('posts:group_posts', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': self.user}),
+        )
+
+    def test_unchanged_page_is_304(self):
+        """Повторный запрос с ETag получает 304 одним запросом к базе."""
+        for url in self.urls:
+            with self.subTest(url=url):
+                etag = self.guest_client.get(url)['ETag']
+                with self.assertNumQueries(1):
+                    response = self.guest_client.get(
+                        url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+
+    def test_validators_do_not_aggregate_posts(self):
+        """ETag ленты строится без COUNT и GROUP BY по её постам."""
+        for url in self.urls[1:]:
+            with self.subTest(url=url):
+                etag = self.guest_client.get(url)['ETag']
+                with CaptureQueriesContext(connection) as queries:
+                    self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+                for query in queries:
+                    self.assertNotIn('GROUP BY', query['sql'])
+                    self.assertNotIn('COUNT(', query['sql'])
+
+    def test_new_post_changes_feed_validators(self):
+        """Новый пост в ленте сбрасывает ETag группы и профиля."""
+        etags = [self.guest_client.get(url)['ETag']
+                 for url in self.urls[1:]]
+        Post.objects.create(
+            author=self.user, group=self.group, text='Новый пост')
+        for url, etag in zip(self.urls[1:], etags):
+            with self.subTest(url=url):
+                response = self.guest_client.get(
+                    url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
+                self.assertContains(response, 'Новый пост')
+
+    def test_feed_validators_shared_between_processes(self):
+        """ETag ленты меняется и там, где в кеше осталась старая версия."""
+        keys = [scope_version_key(group_scope(self.group.slug)),
+                scope_version_key(author_scope(self.user.username))]
+        etags = [self.guest_client.get(url)['ETag']
+                 for url in self.urls[1:]]
+        stale_versions = cache.get_many(keys)
+        Post.objects.create(
+            author=self.user, group=self.group, text='Новый пост')
+        # Другой процесс со своим кешем сигнала не видел.
+        cache.set_many(stale_versions, None)
+        for url, etag in zip(self.urls[1:], etags):
+            with self.subTest(url=url):
+                response = self.guest_client.get(
+                    url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
+
+    def test_edit_changes_validators(self):
+        """Правка поста обновляет updated и сбрасывает ETag."""
+        etags = [self.guest_client.get(url)['ETag'] for url in self.urls]
+        updated = Post.objects.get(pk=self.post.pk).updated
+        self.author_client.post(
+            reverse('posts:post_edit', kwargs={'post_id': self.post.id}),
+            {'text': 'Изменённый текст', 'group': self.group.id},
+        )
+        self.assertGreater(
+            Post.objects.get(pk=self.post.pk).updated, updated)
+        for url, etag in zip(self.urls, etags):
+            with self.subTest(url=url):
+                response = self.guest_client.get(
+                    url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
+                self.assertContains(response, 'Изменённый текст')
+
+    def test_etag_depends_on_user(self):
+        """Копия анонима не подходит авторизованному пользователю."""
+        url = self.urls[0]
+        etag = self.guest_client.get(url)['ETag']
+        response = self.author_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('Last-Modified'))
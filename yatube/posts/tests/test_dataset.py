@@ -0,0 +1,40 @@
+from django.test import TestCase
+
+from ..dataset import START_DATE, generate
+from ..models import AuthorStats, Group, Post
+
+
+class DatasetTests(TestCase):
+    def snapshot(self, prefix):
+        return list(
+            Post.objects.filter(author__username__startswith=prefix)
+            .order_by('pub_date')
+            .values_list('text', 'pub_date', 'group__title')
+        )
+
+    def test_same_seed_gives_same_data(self):
+        """Одинаковый seed даёт одинаковые посты, даты и группы."""
+        generate(5, 2, 30, seed=7, prefix='first')
+        generate(5, 2, 30, seed=7, prefix='second')
+        self.assertEqual(self.snapshot('first'), self.snapshot('second'))
+        self.assertEqual(Group.objects.count(), 4)
+
+    def test_counters_match_generated_posts(self):
+        """После генерации счётчики авторов сходятся с таблицей."""
+        generate(3, 1, 20, prefix='gen')
+        self.assertEqual(
+            sum(AuthorStats.objects.values_list('posts_count', flat=True)),
+            20,
+        )
+
+    def test_explicit_pub_date_and_computed_fields(self):
+        """Даты берутся из генератора, вычисляемые поля заполнены."""
+        generate(1, 1, 3, prefix='gen')
+        posts = Post.objects.order_by('pub_date')
+        self.assertEqual(posts[0].pub_date, START_DATE)
+        for post in posts:
+            with self.subTest(post=post.pk):
+                self.assertTrue(post.text_html.startswith('<p>'))
+                self.assertTrue(post.excerpt)
+                self.assertIsNotNone(post.updated)
+        self.assertTrue(Post._meta.get_field('pub_date').auto_now_add)
@@ -0,0 +1,74 @@
+import csv
+import io
+import json
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+class ExportTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='MikeyMouse')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='mouses',
+            description='Тестовое описание группы',
+        )
+        cls.posts = [
+            Post.objects.create(
+                author=cls.user, group=cls.group, text=f'Пост, "{number}"')
+            for number in range(3)
+        ]
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def export(self, name, fmt, **params):
+        kwargs = ({'slug': self.group.slug} if name == 'posts:group_export'
+                  else {'username': self.user.username})
+        return self.guest_client.get(
+            reverse(name, kwargs={**kwargs, 'fmt': fmt}), params)
+
+    def test_csv_export(self):
+        """Группа выгружается в CSV потоком, от старых постов к новым."""
+        response = self.export('posts:group_export', 'csv')
+        self.assertTrue(response.streaming)
+        self.assertIn('attachment', response['Content-Disposition'])
+        rows = list(csv.DictReader(io.StringIO(
+            b''.join(response.streaming_content).decode())))
+        self.assertEqual(
+            [row['text'] for row in rows],
+            [post.text for post in self.posts])
+        self.assertEqual(rows[0]['group'], self.group.slug)
+
+    def test_jsonl_export_since(self):
+        """since= отдаёт только посты, опубликованные после метки."""
+        since = self.posts[0].pub_date
+        response = self.export(
+            'posts:profile_export', 'jsonl', since=since.isoformat())
+        rows = [json.loads(line) for line in
+                b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual(
+            [row['id'] for row in rows],
+            [post.id for post in self.posts
+             if post.pub_date > since])
+        future = since + timedelta(days=1)
+        response = self.export(
+            'posts:profile_export', 'jsonl', since=future.isoformat())
+        self.assertEqual(b''.join(response.streaming_content), b'')
+
+    def test_bad_arguments(self):
+        """Неизвестный формат даёт 404, битый since — 400."""
+        self.assertEqual(
+            self.export('posts:group_export', 'xml').status_code, 404)
+        self.assertEqual(
+            self.export('posts:group_export', 'csv',
+                        since='вчера').status_code, 400)
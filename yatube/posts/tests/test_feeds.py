@@ -0,0 +1,78 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..feeds import FEED_SIZE
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+class FeedTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='MikeyMouse')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='mouses',
+            description='Тестовое описание группы',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user, group=cls.group, text='Тестовый пост в ленте')
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_feeds_list_posts(self):
+        """RSS и Atom всех лент содержат пост и верный тип."""
+        group_rss = reverse('posts:group_rss',
+                            kwargs={'slug': self.group.slug})
+        profile_atom = reverse('posts:profile_atom',
+                               kwargs={'username': self.user.username})
+        feeds = {
+            reverse('posts:index_rss'): 'application/rss+xml',
+            reverse('posts:index_atom'): 'application/atom+xml',
+            group_rss: 'application/rss+xml',
+            profile_atom: 'application/atom+xml',
+        }
+        for url, content_type in feeds.items():
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertTrue(response['Content-Type'].startswith(
+                    content_type))
+                self.assertContains(response, self.post.text)
+
+    def test_feed_size_is_limited(self):
+        """В ленте не больше FEED_SIZE записей."""
+        Post.objects.bulk_create(
+            Post(author=self.user, text=f'Пост {number}')
+            for number in range(FEED_SIZE + 5)
+        )
+        response = self.guest_client.get(reverse('posts:index_rss'))
+        self.assertEqual(response.content.count(b'<item>'), FEED_SIZE)
+
+    def test_conditional_get(self):
+        """Повторный опрос получает 304, пока лента не изменилась."""
+        url = reverse('posts:group_rss', kwargs={'slug': self.group.slug})
+        response = self.guest_client.get(url)
+        etag = response['ETag']
+        with self.assertNumQueries(0):
+            response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        response = self.guest_client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+        post = Post.objects.get(pk=self.post.pk)
+        post.text = 'Изменённый текст'
+        post.save()
+        response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Изменённый текст')
+
+    def test_unknown_group_is_404(self):
+        response = self.guest_client.get(
+            reverse('posts:group_rss', kwargs={'slug': 'no-such-group'}))
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,54 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Group, Post
+from ..views import NUMBER_OF_GROUPS
+
+User = get_user_model()
+
+
+class GroupIndexTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='MikeyMouse')
+        Group.objects.bulk_create(
+            Group(title=f'Группа {number}', slug=f'group-{number:03}',
+                  description='Описание')
+            for number in range(NUMBER_OF_GROUPS + 5)
+        )
+        cls.group = Group.objects.get(slug='group-000')
+        cls.posts = [
+            Post.objects.create(author=cls.user, group=cls.group,
+                                text=f'Пост {number}')
+            for number in range(3)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.url = reverse('posts:group_index')
+
+    def test_groups_are_annotated(self):
+        """Каталог показывает число постов и дату последнего поста."""
+        with self.assertNumQueries(2):
+            response = self.guest_client.get(self.url)
+        page_obj = response.context['page_obj']
+        self.assertEqual(len(page_obj), NUMBER_OF_GROUPS)
+        self.assertEqual(page_obj.paginator.num_pages, 2)
+        first, second = page_obj[0], page_obj[1]
+        self.assertEqual(first.posts_count, 3)
+        self.assertEqual(first.latest_pub_date, self.posts[-1].pub_date)
+        self.assertEqual(second.posts_count, 0)
+        self.assertIsNone(second.latest_pub_date)
+
+    def test_directory_cache_reset_on_write(self):
+        """Новый пост в группе сбрасывает кеш каталога."""
+        self.guest_client.get(self.url)
+        with self.assertNumQueries(0):
+            self.guest_client.get(self.url)
+        Post.objects.create(author=self.user, group=self.group, text='Ещё')
+        response = self.guest_client.get(self.url)
+        self.assertEqual(response.context['page_obj'][0].posts_count, 4)
@@ -0,0 +1,131 @@
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from ..cache import get_scope_version, group_scope
+from ..dataset import insert_posts
+from ..models import AuthorStats, Group, Post
+
+User = get_user_model()
+
+
+class ImportPostsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='MikeyMouse')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='mouses',
+            description='Тестовое описание группы',
+        )
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, name, content):
+        path = os.path.join(self.directory, name)
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(content)
+        return path
+
+    def import_posts(self, path, **options):
+        call_command('import_posts', path, stdout=StringIO(),
+                     stderr=StringIO(), **options)
+
+    def test_import_jsonl(self):
+        """JSONL импортируется, строки с неизвестным автором
+        или группой пропускаются.
+        """
+        rows = [
+            {'text': 'Первый', 'author': 'MikeyMouse', 'group': 'mouses',
+             'pub_date': '2021-05-01T10:00:00'},
+            {'text': 'Второй', 'author': 'MikeyMouse'},
+            {'text': 'Чужой', 'author': 'nobody'},
+            {'text': 'Без группы', 'author': 'MikeyMouse', 'group': 'none'},
+        ]
+        path = self.write(
+            'posts.jsonl', '\n'.join(json.dumps(row) for row in rows))
+        self.import_posts(path, chunk_size=2)
+        self.assertEqual(
+            set(Post.objects.values_list('text', flat=True)),
+            {'Первый', 'Второй'})
+        first = Post.objects.get(text='Первый')
+        self.assertEqual(first.group, self.group)
+        self.assertEqual(first.pub_date.year, 2021)
+        self.assertEqual(
+            AuthorStats.objects.get(author=self.user).posts_count, 2)
+        self.assertFalse(os.path.exists(f'{path}.checkpoint'))
+
+    def test_bad_lines_are_skipped(self):
+        """Битый JSON, не объект и нераспознанная дата пропускаются."""
+        path = self.write('posts.jsonl', '\n'.join((
+            '{"text": "Первый", "author": "MikeyMouse"}',
+            '{"text": "обрыв',
+            '["не", "объект"]',
+            '{"text": "Дата", "author": "MikeyMouse", "pub_date": "вчера"}',
+            '{"text": "Список", "author": ["MikeyMouse"]}',
+            '{"text": "Последний", "author": "MikeyMouse"}',
+        )))
+        stderr = StringIO()
+        call_command('import_posts', path, stdout=StringIO(), stderr=stderr)
+        self.assertEqual(
+            set(Post.objects.values_list('text', flat=True)),
+            {'Первый', 'Последний'})
+        for number in (2, 3, 4, 5):
+            with self.subTest(line=number):
+                self.assertIn(f'Строка {number} пропущена', stderr.getvalue())
+
+    def test_import_csv_resumes_after_failure(self):
+        """После сбоя импорт продолжается с сохранённого смещения
+        и сбрасывает кеш лент, затронутых до сбоя.
+        """
+        path = self.write(
+            'posts.csv',
+            'text,author,group\n'
+            'Первый,MikeyMouse,mouses\n'
+            '"Второй,\nв две строки",MikeyMouse,\n'
+            'Третий,MikeyMouse,\n',
+        )
+        version = get_scope_version(group_scope(self.group.slug))
+        inserted = []
+
+        def insert_once(posts):
+            if inserted:
+                raise RuntimeError('сбой')
+            inserted.append(posts)
+            insert_posts(posts)
+
+        with mock.patch(
+                'posts.management.commands.import_posts.insert_posts',
+                insert_once):
+            with self.assertRaises(RuntimeError):
+                self.import_posts(path, chunk_size=1)
+        with open(f'{path}.checkpoint') as file:
+            state = json.load(file)
+        self.assertEqual(state['rows'], 1)
+        self.assertEqual(state['offset'], len(
+            'text,author,group\nПервый,MikeyMouse,mouses\n'.encode()))
+        self.import_posts(path, chunk_size=1)
+        self.assertEqual(
+            sorted(Post.objects.values_list('text', flat=True)),
+            ['Второй,\nв две строки', 'Первый', 'Третий'])
+        self.assertNotEqual(
+            get_scope_version(group_scope(self.group.slug)), version)
+
+    def test_old_checkpoint_requires_restart(self):
+        """Контрольная точка старого формата не принимается молча."""
+        path = self.write('posts.jsonl', '')
+        self.write('posts.jsonl.checkpoint', '1')
+        with self.assertRaisesMessage(CommandError, '--restart'):
+            self.import_posts(path)
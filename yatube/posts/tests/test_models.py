@@ -1,7 +1,11 @@
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 
-from ..models import Group, Post
+from ..counters import recount_posts
+from ..models import AuthorStats, Group, Post
 
 User = get_user_model()
 
@@ -29,6 +33,9 @@ class PostModelTests(TestCase):
         expected_post_str = post.text[:15]
         self.assertEqual(expected_post_str, str(post))
 
+        unsaved_post = Post(author=self.user, text=post.text)
+        self.assertEqual(expected_post_str, str(unsaved_post))
+
         group = PostModelTests.group
         expected_group_str = group.title
         self.assertEqual(expected_group_str, str(group))
@@ -58,3 +65,75 @@ class PostModelTests(TestCase):
             with self.subTest(field=field):
                 self.assertEqual(
                     post._meta.get_field(field).help_text, expected_value)
+
+
+class AuthorStatsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.other_user = User.objects.create_user(username='other')
+
+    def posts_count(self, user):
+        return AuthorStats.objects.get(author=user).posts_count
+
+    def test_counter_follows_create_and_delete(self):
+        """Счётчик постов растёт при создании и падает при удалении."""
+        post = Post.objects.create(author=self.user, text='Первый')
+        Post.objects.create(author=self.user, text='Второй')
+        self.assertEqual(self.posts_count(self.user), 2)
+        post.delete()
+        self.assertEqual(self.posts_count(self.user), 1)
+
+    def test_counter_follows_author_change(self):
+        """Смена автора поста переносит его в счётчик нового автора."""
+        post = Post.objects.create(author=self.user, text='Пост')
+        Post.objects.create(author=self.other_user, text='Пост')
+        post.author = self.other_user
+        post.save()
+        self.assertEqual(self.posts_count(self.user), 0)
+        self.assertEqual(self.posts_count(self.other_user), 2)
+
+    def test_user_cascade_removes_counter(self):
+        """Удаление автора удаляет его посты и счётчик."""
+        user = User.objects.create_user(username='removed')
+        Post.objects.create(author=user, text='Пост')
+        user.delete()
+        self.assertFalse(AuthorStats.objects.filter(author_id=user.id))
+
+    def test_user_cascade_queries_do_not_grow_with_posts(self):
+        """Удаление автора не ходит в базу на каждый его пост."""
+        group = Group.objects.create(title='Группа', slug='group')
+        group_url = reverse('posts:group_posts', kwargs={'slug': 'group'})
+        queries = []
+        for posts in (1, 30):
+            user = User.objects.create_user(username=f'removed_{posts}')
+            for number in range(posts):
+                Post.objects.create(author=user, group=group,
+                                    text=f'Пост {user.username}')
+            # Лента группы попадает в кеш и должна сброситься.
+            self.assertContains(Client().get(group_url), user.username)
+            with CaptureQueriesContext(connection) as captured:
+                user.delete()
+            queries.append(len(captured))
+            self.assertNotContains(Client().get(group_url), user.username)
+        self.assertEqual(queries[0], queries[1])
+
+    def test_recount_repairs_counters(self):
+        """recount_posts исправляет разошедшиеся счётчики."""
+        Post.objects.bulk_create(
+            Post(author=self.user, text=f'Пост {number}')
+            for number in range(3)
+        )
+        AuthorStats.objects.filter(author=self.user).delete()
+        AuthorStats.objects.create(author=self.other_user, posts_count=5)
+        self.assertEqual(recount_posts(), 2)
+        self.assertEqual(self.posts_count(self.user), 3)
+        self.assertEqual(self.posts_count(self.other_user), 0)
+
+    def test_recount_many_authors(self):
+        """Счётчики заводятся пачками, которые принимает база."""
+        User.objects.bulk_create(
+            User(username=f'author_{number}') for number in range(600))
+        recount_posts(batch_size=1000)
+        self.assertEqual(AuthorStats.objects.count(), User.objects.count())
@@ -0,0 +1,156 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Post
+from ..paginators import (LAST_PAGE, NUMBERED_PAGES, PAGE_WINDOW,
+                          CursorPaginator, FeedPaginator, decode_cursor,
+                          encode_cursor)
+from ..views import NUMBER_OF_POSTS
+
+User = get_user_model()
+
+
+class CursorPaginatorTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='MikeyMouse')
+        for number in range(NUMBER_OF_POSTS + 3):
+            Post.objects.create(author=cls.user, text=f'Пост {number}')
+        cls.ordered = list(Post.objects.order_by('-pub_date', '-id'))
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def test_cursor_round_trip(self):
+        """Токен курсора обратимо кодирует позицию (pub_date, id)."""
+        post = self.ordered[0]
+        token = encode_cursor(post.pub_date, post.id)
+        self.assertEqual(decode_cursor(token), (post.pub_date, post.id))
+        self.assertIsNone(decode_cursor('не-токен'))
+
+    def test_pages_follow_each_other(self):
+        """Страницы after/before идут подряд без пропусков и повторов."""
+        paginator = CursorPaginator(Post.objects.all(), NUMBER_OF_POSTS)
+        first = paginator.get_cursor_page()
+        self.assertEqual(list(first), self.ordered[:NUMBER_OF_POSTS])
+        self.assertTrue(first.has_next())
+        second = paginator.get_cursor_page(after=first.next_cursor)
+        self.assertEqual(list(second), self.ordered[NUMBER_OF_POSTS:])
+        self.assertFalse(second.has_next())
+        back = paginator.get_cursor_page(before=second.previous_cursor)
+        self.assertEqual(list(back), self.ordered[:NUMBER_OF_POSTS])
+        self.assertFalse(back.has_previous())
+
+    def test_feed_views_accept_cursor(self):
+        """Ленты index, group_posts и profile принимают ?after=."""
+        token = encode_cursor(*CursorPaginator.position(
+            self.ordered[NUMBER_OF_POSTS - 1]))
+        response = self.guest_client.get(
+            reverse('posts:profile', kwargs={'username': self.user}),
+            {'after': token},
+        )
+        page_obj = response.context['page_obj']
+        self.assertEqual(list(page_obj), self.ordered[NUMBER_OF_POSTS:])
+        self.assertTemplateUsed(
+            response, 'posts/includes/cursor_paginator.html')
+
+    def test_broken_cursor_falls_back_to_first_page(self):
+        """Битый курсор отдаёт первую страницу, а не ошибку."""
+        response = self.guest_client.get(
+            reverse('posts:index'), {'after': '%%%'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            list(response.context['page_obj']),
+            self.ordered[:NUMBER_OF_POSTS])
+
+
+class FeedPaginatorTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='MikeyMouse')
+        Post.objects.bulk_create(
+            Post(author=cls.user, text=f'Пост {number}')
+            for number in range(NUMBER_OF_POSTS * 20)
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.author_client = Client()
+        self.author_client.force_login(self.user)
+
+    def test_page_window_is_bounded(self):
+        """Ссылок на страницы не больше окна вокруг текущей."""
+        response = self.author_client.get(
+            reverse('posts:index'), {'page': 3})
+        page_obj = response.context['page_obj']
+        self.assertEqual(page_obj.paginator.num_pages, 20)
+        self.assertEqual(
+            list(page_obj.page_window),
+            list(range(3 - PAGE_WINDOW, 3 + PAGE_WINDOW + 1)))
+        self.assertContains(response, '?page=4"')
+        self.assertNotContains(response, '?page=6"')
+
+    def test_deep_pages_linked_by_cursor(self):
+        """Дальше NUMBERED_PAGES ссылки ведут по курсору, а не OFFSET."""
+        ordered = list(Post.objects.order_by('-pub_date', '-id'))
+        response = self.author_client.get(
+            reverse('posts:index'), {'page': NUMBERED_PAGES})
+        page_obj = response.context['page_obj']
+        self.assertFalse(
+            [number for number in page_obj.page_window
+             if number > NUMBERED_PAGES])
+        self.assertTrue(page_obj.next_query.startswith('after='))
+        self.assertContains(response, f'?{page_obj.next_query}"')
+        self.assertContains(response, f'?before={LAST_PAGE}"')
+        response = self.author_client.get(
+            f'{reverse("posts:index")}?{page_obj.next_query}')
+        start = NUMBERED_PAGES * NUMBER_OF_POSTS
+        self.assertEqual(list(response.context['page_obj']),
+                         ordered[start:start + NUMBER_OF_POSTS])
+        response = self.author_client.get(
+            reverse('posts:index'), {'before': LAST_PAGE})
+        page_obj = response.context['page_obj']
+        self.assertEqual(list(page_obj), ordered[-NUMBER_OF_POSTS:])
+        self.assertFalse(page_obj.has_next())
+        self.assertTrue(page_obj.has_previous())
+
+    def test_deep_numbered_page_keeps_current(self):
+        """На ?page=N дальше NUMBERED_PAGES текущая страница видна."""
+        for number, window in ((NUMBERED_PAGES + 1,
+                                [NUMBERED_PAGES - 1, NUMBERED_PAGES,
+                                 NUMBERED_PAGES + 1]),
+                               (NUMBERED_PAGES + 3, [NUMBERED_PAGES + 3])):
+            with self.subTest(page=number):
+                response = self.author_client.get(
+                    reverse('posts:index'), {'page': number})
+                page_obj = response.context['page_obj']
+                self.assertEqual(page_obj.number, number)
+                self.assertEqual(page_obj.page_window, window)
+                self.assertContains(
+                    response, f'<span class="page-link">{number}</span>')
+
+    def test_feed_count_cached_until_write(self):
+        """COUNT(*) ленты выполняется один раз до следующей записи."""
+        url = reverse('posts:index')
+        self.author_client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            self.author_client.get(url)
+        self.assertFalse(
+            [q for q in queries if 'COUNT(' in q['sql']])
+        Post.objects.create(author=self.user, text='Новый пост')
+        response = self.author_client.get(url)
+        self.assertEqual(
+            response.context['page_obj'].paginator.count,
+            NUMBER_OF_POSTS * 20 + 1)
+
+    def test_stale_count_keeps_full_page(self):
+        """Отставший счётчик не обрезает страницу."""
+        paginator = FeedPaginator(
+            Post.objects.all(), NUMBER_OF_POSTS, count=3)
+        self.assertEqual(len(paginator.get_page(1)), NUMBER_OF_POSTS)
@@ -0,0 +1,124 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..counters import recount_posts
+from ..models import Group, Post
+
+User = get_user_model()
+
+# Верхняя граница числа SQL-запросов для каждого URL из posts/urls.py.
+# Сессию (cached_db) и пользователя (CachedAuthenticationMiddleware)
+# авторизованный клиент берёт из кеша и запросов на них не тратит;
+# group_posts, profile и post_detail — ещё один на валидаторы ETag.
+QUERY_BUDGETS = {
+    'posts:index': 2,
+    'posts:index_rss': 1,
+    'posts:index_atom': 1,
+    'posts:group_index': 2,
+    'posts:group_posts': 4,
+    'posts:group_export': 2,
+    'posts:group_rss': 2,
+    'posts:group_atom': 2,
+    'posts:profile': 3,
+    'posts:profile_export': 2,
+    'posts:profile_rss': 2,
+    'posts:profile_atom': 2,
+    'posts:post_detail': 2,
+    'posts:post_edit': 2,
+    'posts:post_create': 1,
+    'posts:search': 3,
+}
+
+
+class QueryBudgetTests(TestCase):
+    """Число запросов на странице не зависит от числа постов."""
+    seed_sizes = (1, 10, 1000)
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='MikeyMouse', first_name='Mikey', last_name='Mouse')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='mouses',
+            description='Тестовое описание группы',
+        )
+
+    def setUp(self):
+        self.author_client = Client()
+        self.author_client.force_login(self.user)
+
+    def seed(self, size):
+        cache.clear()
+        Post.objects.all().delete()
+        Post.objects.bulk_create(
+            Post(author=self.user, group=self.group, text=f'Пост {number}')
+            for number in range(size)
+        )
+        # bulk_create обходит сигналы, поэтому счётчики правим явно.
+        recount_posts()
+        # Сессия и пользователь снова попадают в очищенный кеш.
+        self.author_client.get(reverse('about:author'))
+        return Post.objects.first()
+
+    def urls(self, post):
+        return {
+            'posts:index': reverse('posts:index'),
+            'posts:index_rss': reverse('posts:index_rss'),
+            'posts:index_atom': reverse('posts:index_atom'),
+            'posts:group_index': reverse('posts:group_index'),
+            'posts:group_posts': reverse(
+                'posts:group_posts', kwargs={'slug': self.group.slug}),
+            'posts:group_export': reverse(
+                'posts:group_export',
+                kwargs={'slug': self.group.slug, 'fmt': 'csv'}),
+            'posts:group_rss': reverse(
+                'posts:group_rss', kwargs={'slug': self.group.slug}),
+            'posts:group_atom': reverse(
+                'posts:group_atom', kwargs={'slug': self.group.slug}),
+            'posts:profile': reverse(
+                'posts:profile', kwargs={'username': self.user.username}),
+            'posts:profile_export': reverse(
+                'posts:profile_export',
+                kwargs={'username': self.user.username, 'fmt': 'jsonl'}),
+            'posts:profile_rss': reverse(
+                'posts:profile_rss',
+                kwargs={'username': self.user.username}),
+            'posts:profile_atom': reverse(
+                'posts:profile_atom',
+                kwargs={'username': self.user.username}),
+            'posts:post_detail': reverse(
+                'posts:post_detail', kwargs={'post_id': post.id}),
+            'posts:post_edit': reverse(
+                'posts:post_edit', kwargs={'post_id': post.id}),
+            'posts:post_create': reverse('posts:post_create'),
+            'posts:search': reverse('posts:search') + '?q=Пост',
+        }
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.author_client.get(url)
+            if response.streaming:
+                b''.join(response.streaming_content)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_query_count_is_constant(self):
+        """Каждый URL укладывается в бюджет запросов при 1, 10 и 1000
+        постах в базе.
+        """
+        counts = {}
+        for size in self.seed_sizes:
+            post = self.seed(size)
+            for name, url in self.urls(post).items():
+                counts.setdefault(name, []).append(self.count_queries(url))
+        self.assertEqual(set(counts), set(QUERY_BUDGETS))
+        for name, measured in counts.items():
+            with self.subTest(url=name, measured=measured):
+                self.assertEqual(len(set(measured)), 1)
+                self.assertLessEqual(measured[0], QUERY_BUDGETS[name])
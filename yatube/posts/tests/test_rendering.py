@@ -0,0 +1,119 @@
+import io
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Post
+from ..rendering import EXCERPT_LENGTH, RENDERER_VERSION, render_text
+
+User = get_user_model()
+
+
+class RenderedTextTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='MikeyMouse')
+
+    def setUp(self):
+        self.author_client = Client()
+        self.author_client.force_login(self.user)
+
+    def test_html_rendered_on_save(self):
+        """HTML считается при создании и правке поста через формы."""
+        self.author_client.post(
+            reverse('posts:post_create'), {'text': 'Первая строка\nвторая'})
+        post = Post.objects.get()
+        self.assertEqual(post.text_html, '<p>Первая строка<br>вторая</p>')
+        self.assertEqual(post.text_html_version, RENDERER_VERSION)
+        self.author_client.post(
+            reverse('posts:post_edit', kwargs={'post_id': post.id}),
+            {'text': 'Один\n\nдва'})
+        post.refresh_from_db()
+        self.assertEqual(post.text_html, '<p>Один</p>\n\n<p>два</p>')
+
+    def test_html_is_escaped(self):
+        post = Post.objects.create(author=self.user, text='<b>жирный</b>')
+        self.assertEqual(post.text_html, render_text('<b>жирный</b>'))
+        self.assertNotIn('<b>', post.text_html)
+        response = self.author_client.get(
+            reverse('posts:post_detail', kwargs={'post_id': post.id}))
+        self.assertContains(response, post.text_html, html=True)
+
+    def test_bulk_create_renders(self):
+        """bulk_create тоже заполняет HTML, минуя save()."""
+        Post.objects.bulk_create([Post(author=self.user, text='Массово')])
+        self.assertEqual(
+            Post.objects.get().text_html, '<p>Массово</p>')
+
+    def test_rerender_command(self):
+        """Команда перерисовывает только посты старой версии."""
+        old = Post.objects.create(author=self.user, text='Пост 0')
+        Post.objects.create(author=self.user, text='Пост 1')
+        Post.objects.filter(pk=old.pk).update(
+            text_html='', text_html_version=0)
+        stdout = io.StringIO()
+        call_command('rerender_posts', stdout=stdout)
+        self.assertIn('Перерисовано постов: 1', stdout.getvalue())
+        updated = old.updated
+        old.refresh_from_db()
+        self.assertEqual(old.text_html, '<p>Пост 0</p>')
+        self.assertEqual(old.text_html_version, RENDERER_VERSION)
+        # Сдвиг updated меняет ETag и Last-Modified страницы поста.
+        self.assertGreater(old.updated, updated)
+
+
+class ExcerptTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_superuser(
+            username='MikeyMouse', email='mikey@yatube.ru', password='pass')
+        cls.long_post = Post.objects.create(
+            author=cls.user, text='слово ' * EXCERPT_LENGTH)
+        cls.short_post = Post.objects.create(
+            author=cls.user, text='Короткий пост')
+
+    def setUp(self):
+        self.author_client = Client()
+        self.author_client.force_login(self.user)
+
+    def test_excerpt_fields(self):
+        self.assertTrue(self.long_post.is_truncated)
+        self.assertLessEqual(len(self.long_post.excerpt), EXCERPT_LENGTH)
+        self.assertTrue(self.long_post.excerpt.endswith('…'))
+        self.assertFalse(self.short_post.is_truncated)
+        self.assertEqual(self.short_post.excerpt, self.short_post.text)
+        self.assertEqual(str(self.long_post), self.long_post.text[:15])
+
+    def test_lists_load_only_excerpt(self):
+        """Ленты и changelist админки не читают полный текст."""
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:profile', kwargs={'username': self.user}),
+            reverse('admin:posts_post_changelist'),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.author_client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertFalse([
+                    query for query in queries
+                    if '"posts_post"."text"' in query['sql']
+                    and 'SELECT' in query['sql']
+                ])
+
+    def test_read_more_link(self):
+        """У длинного поста в ленте есть ссылка на полный текст."""
+        detail_url = reverse(
+            'posts:post_detail', kwargs={'post_id': self.long_post.id})
+        response = self.author_client.get(reverse('posts:index'))
+        self.assertContains(response, 'Читать дальше', count=1)
+        self.assertContains(response, f'href="{detail_url}"')
+        response = self.author_client.get(detail_url)
+        self.assertContains(response, self.long_post.text.strip())
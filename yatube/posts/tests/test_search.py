@@ -0,0 +1,69 @@
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Post
+from ..search import search_posts
+
+User = get_user_model()
+
+
+class PostSearchTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_superuser(
+            username='MikeyMouse', email='mikey@yatube.ru', password='pass')
+        cls.post = Post.objects.create(
+            author=cls.user,
+            text='Сыр лежит на столе',
+        )
+        cls.relevant_post = Post.objects.create(
+            author=cls.user,
+            text='Сыр, сыр и ещё раз сыр',
+        )
+
+    def setUp(self):
+        self.guest_client = Client()
+        self.admin_client = Client()
+        self.admin_client.force_login(self.user)
+
+    def found(self, query):
+        return list(search_posts(query)[:10])
+
+    def test_search_ranks_by_relevance(self):
+        """Поиск находит посты по префиксу слова, самые
+        релевантные идут первыми.
+        """
+        self.assertEqual(self.found('сыр'), [self.relevant_post, self.post])
+        self.assertEqual(self.found('стол'), [self.post])
+
+    def test_index_follows_edit_and_delete(self):
+        """Индекс обновляется при правке и удалении поста."""
+        post = Post.objects.create(author=self.user, text='Старый текст')
+        post.text = 'Новый текст'
+        post.save()
+        self.assertEqual(self.found('Старый'), [])
+        self.assertEqual(self.found('Новый'), [post])
+        post.delete()
+        self.assertEqual(self.found('Новый'), [])
+
+    def test_query_syntax_is_escaped(self):
+        """Служебные символы FTS5 в запросе не ломают поиск."""
+        for query in ('"', 'сыр OR', 'NEAR(', '*', '-сыр'):
+            with self.subTest(query=query):
+                self.found(query)
+
+    def test_search_page(self):
+        """Публичная страница поиска показывает найденные посты."""
+        response = self.guest_client.get(
+            reverse('posts:search'), {'q': 'стол'})
+        self.assertEqual(list(response.context['page_obj']), [self.post])
+        self.assertContains(response, self.post.text)
+
+    def test_admin_search_uses_index(self):
+        """Поиск в админке идёт через полнотекстовый индекс."""
+        response = self.admin_client.get(
+            reverse('admin:posts_post_changelist'), {'q': 'стол'})
+        self.assertEqual(
+            list(response.context['cl'].result_list), [self.post])
@@ -1,14 +1,35 @@
 from django.urls import path
 
-from . import views
+from . import feeds, views
+from .cache import INDEX_SCOPE, author_scope, cache_feed, group_scope
+
+index_feed = cache_feed(lambda: INDEX_SCOPE)
+group_feed = cache_feed(group_scope)
+author_feed = cache_feed(author_scope)
 
 app_name = 'posts'
 
 urlpatterns = [
     path('', views.index, name='index'),
+    path('rss/', index_feed(feeds.IndexFeed()), name='index_rss'),
+    path('atom/', index_feed(feeds.IndexAtomFeed()), name='index_atom'),
+    path('groups/', views.group_index, name='group_index'),
     path('group/<slug:slug>/', views.group_posts, name='group_posts'),
+    path('group/<slug:slug>/export.<str:fmt>', views.group_export,
+         name='group_export'),
+    path('group/<slug:slug>/rss/', group_feed(feeds.GroupFeed()),
+         name='group_rss'),
+    path('group/<slug:slug>/atom/', group_feed(feeds.GroupAtomFeed()),
+         name='group_atom'),
     path('profile/<str:username>/', views.profile, name='profile'),
+    path('profile/<str:username>/export.<str:fmt>', views.profile_export,
+         name='profile_export'),
+    path('profile/<str:username>/rss/', author_feed(feeds.AuthorFeed()),
+         name='profile_rss'),
+    path('profile/<str:username>/atom/',
+         author_feed(feeds.AuthorAtomFeed()), name='profile_atom'),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
     path('posts/<int:post_id>/edit/', views.post_edit, name='post_edit'),
     path('create/', views.post_create, name='post_create'),
+    path('search/', views.search, name='search'),
 ]
@@ -1,18 +1,46 @@
-from django.core.paginator import Paginator
+from urllib.parse import urlencode
+
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.http import Http404, HttpResponseBadRequest
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 
-from .models import Post, Group, User
+from .models import FULL_TEXT_FIELDS, Post, Group, User
+from .cache import (GROUPS_SCOPE, INDEX_SCOPE, author_scope,
+                    cache_anonymous_page,
+                    get_feed_count, group_scope, render_cards)
+from .conditional import (author_state, conditional_page, group_state,
+                          post_state)
+from .counters import get_posts_count
+from .exports import CONTENT_TYPES, export_response
 from .forms import PostForm
+from .paginators import FeedPaginator, paginate
+from .search import search_posts
 
 NUMBER_OF_POSTS: int = 10
+NUMBER_OF_GROUPS: int = 50
+
+
+def feed_queryset(queryset):
+    """Подтягивает автора и группу поста тем же запросом.
+
+    Полный текст не загружается: карточке ленты хватает анонса.
+    """
+    return queryset.select_related('author', 'group').defer(
+        *FULL_TEXT_FIELDS)
 
 
+@cache_anonymous_page(lambda: INDEX_SCOPE)
 def index(request):
-    post_list = Post.objects.all()
-    paginator = Paginator(post_list, NUMBER_OF_POSTS)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    post_list = feed_queryset(Post.objects.all())
+    page_obj = paginate(
+        request, post_list, NUMBER_OF_POSTS,
+        count=lambda: get_feed_count(INDEX_SCOPE, post_list),
+    )
+    render_cards(page_obj)
     context = {
         'page_obj': page_obj,
         'title': 'Последние обновления на сайте',
@@ -21,12 +49,16 @@ def index(request):
     return render(request, template, context)
 
 
+@conditional_page(group_state)
+@cache_anonymous_page(group_scope)
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
-    post_list = group.posts.all()
-    paginator = Paginator(post_list, NUMBER_OF_POSTS)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    post_list = feed_queryset(group.posts.all())
+    page_obj = paginate(
+        request, post_list, NUMBER_OF_POSTS,
+        count=lambda: get_feed_count(group_scope(slug), post_list),
+    )
+    render_cards(page_obj)
     context = {
         'group': group,
         'page_obj': page_obj,
@@ -35,13 +67,49 @@ def group_posts(request, slug):
     return render(request, template, context)
 
 
+def annotated_groups():
+    """Группы с числом постов и датой последнего поста.
+
+    Оба значения — коррелированные подзапросы по индексу
+    (group, pub_date). При сортировке по уникальному slug SQLite
+    вычисляет их только для строк текущей страницы, а не для всех
+    групп, как сделал бы GROUP BY по таблице постов.
+    """
+    posts = Post.objects.filter(group=OuterRef('pk')).order_by()
+    return Group.objects.annotate(
+        posts_count=Coalesce(Subquery(
+            posts.values('group').annotate(
+                count=Count('id')).values('count'),
+            output_field=IntegerField(),
+        ), 0),
+        latest_pub_date=Subquery(
+            posts.order_by('-pub_date').values('pub_date')[:1]),
+    ).order_by('slug')
+
+
+@cache_anonymous_page(lambda: GROUPS_SCOPE)
+def group_index(request):
+    page_obj = FeedPaginator(
+        annotated_groups(), NUMBER_OF_GROUPS,
+        count=lambda: get_feed_count(GROUPS_SCOPE, Group.objects.all()),
+    ).get_page(request.GET.get('page'))
+    context = {
+        'page_obj': page_obj,
+    }
+    template = 'posts/group_index.html'
+    return render(request, template, context)
+
+
+@conditional_page(author_state)
+@cache_anonymous_page(author_scope)
 def profile(request, username):
-    user_name = get_object_or_404(User, username=username)
-    posts_counter = user_name.posts.count()
-    post_list = user_name.posts.all()
-    paginator = Paginator(post_list, NUMBER_OF_POSTS)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    user_name = get_object_or_404(
+        User.objects.select_related('post_stats'), username=username)
+    posts_counter = get_posts_count(user_name)
+    post_list = feed_queryset(user_name.posts.all())
+    page_obj = paginate(
+        request, post_list, NUMBER_OF_POSTS, count=posts_counter)
+    render_cards(page_obj)
     context = {
         'user_name': user_name,
         'posts_counter': posts_counter,
@@ -51,10 +119,59 @@ def profile(request, username):
     return render(request, template, context)
 
 
+def export_posts(request, queryset, fmt, filename):
+    if fmt not in CONTENT_TYPES:
+        raise Http404
+    since = request.GET.get('since')
+    if since:
+        try:
+            since = parse_datetime(since)
+        except ValueError:
+            since = None
+        if since is None:
+            return HttpResponseBadRequest(
+                'since должен быть датой в формате ISO 8601')
+        if timezone.is_naive(since):
+            since = timezone.make_aware(since)
+        queryset = queryset.filter(pub_date__gt=since)
+    return export_response(queryset, fmt, filename)
+
+
+def group_export(request, slug, fmt):
+    group = get_object_or_404(Group, slug=slug)
+    return export_posts(request, group.posts.all(), fmt, f'group-{slug}')
+
+
+def profile_export(request, username, fmt):
+    user_name = get_object_or_404(User, username=username)
+    return export_posts(
+        request, user_name.posts.all(), fmt, f'profile-{username}')
+
+
+def search(request):
+    query = request.GET.get('q', '').strip()
+    page_obj = None
+    if query:
+        paginator = FeedPaginator(search_posts(query), NUMBER_OF_POSTS)
+        page_obj = paginator.get_page(request.GET.get('page'))
+        render_cards(page_obj)
+    context = {
+        'query': query,
+        'page_obj': page_obj,
+        'page_query': urlencode({'q': query}) + '&',
+    }
+    template = 'posts/search.html'
+    return render(request, template, context)
+
+
+@conditional_page(post_state)
 def post_detail(request, post_id):
-    one_post = get_object_or_404(Post, id=post_id)
+    one_post = get_object_or_404(
+        Post.objects.select_related('author__post_stats', 'group'),
+        id=post_id,
+    )
     one_post_author = one_post.author
-    posts_counter = one_post_author.posts.count()
+    posts_counter = get_posts_count(one_post_author)
     group_name = one_post.group
     context = {
         'one_post': one_post,
@@ -85,7 +202,8 @@ def post_create(request):
 
 @login_required
 def post_edit(request, post_id):
-    post = get_object_or_404(Post, id=post_id)
+    post = get_object_or_404(
+        Post.objects.select_related('author'), id=post_id)
     form = PostForm(request.POST or None, instance=post)
     if post.author != request.user:
         return redirect('posts:post_detail', post_id)
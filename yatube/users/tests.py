@@ -0,0 +1,66 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from .auth import user_cache_key
+
+User = get_user_model()
+
+
+class CachedUserTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='MikeyMouse', password='old-Passw0rd')
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.login(
+            username='MikeyMouse', password='old-Passw0rd')
+
+    def auth_queries(self, client):
+        with CaptureQueriesContext(connection) as captured:
+            response = client.get(reverse('about:author'))
+        self.assertTrue(response.context['user'].is_authenticated)
+        return [query['sql'] for query in captured
+                if 'auth_user' in query['sql']
+                or 'django_session' in query['sql']]
+
+    def test_user_read_from_cache(self):
+        """Повторный запрос не читает сессию и пользователя из базы."""
+        self.auth_queries(self.authorized_client)
+        self.assertEqual(self.auth_queries(self.authorized_client), [])
+
+    @override_settings(
+        SESSION_ENGINE='django.contrib.sessions.backends.signed_cookies')
+    def test_signed_cookie_sessions(self):
+        """С сессией в подписанной cookie запросов к сессиям нет."""
+        client = Client()
+        client.login(username='MikeyMouse', password='old-Passw0rd')
+        self.auth_queries(client)
+        self.assertEqual(self.auth_queries(client), [])
+
+    def test_password_change_invalidates_cache(self):
+        """Смена пароля сбрасывает кеш и завершает другие сессии."""
+        other_client = Client()
+        other_client.login(username='MikeyMouse', password='old-Passw0rd')
+        self.auth_queries(other_client)
+        self.assertIsNotNone(cache.get(user_cache_key(self.user.pk)))
+        response = self.authorized_client.post(
+            reverse('users:password_change'), {
+                'old_password': 'old-Passw0rd',
+                'new_password1': 'new-Passw0rd',
+                'new_password2': 'new-Passw0rd',
+            })
+        self.assertRedirects(response, reverse('users:password_change_done'),
+                             fetch_redirect_response=False)
+        self.assertIsNone(cache.get(user_cache_key(self.user.pk)))
+        response = other_client.get(reverse('about:author'))
+        self.assertFalse(response.context['user'].is_authenticated)
+        response = self.authorized_client.get(reverse('about:author'))
+        self.assertTrue(response.context['user'].is_authenticated)
@@ -15,18 +15,22 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
-    'posts',
+    'posts.apps.PostsConfig',
     'users.apps.UsersConfig',
     'core',
+    'api',
 ]
 
 
 MIDDLEWARE = [
+    'core.middleware.RequestMetricsMiddleware',
+    'core.middleware.CompressionMiddleware',
+    'core.middleware.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'users.middleware.CachedAuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -38,7 +42,7 @@ TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'core.template_backends.TimedDjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -48,6 +52,7 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
                 'core.context_processors.year.year',
+                'core.context_processors.navigation.navigation',
             ]
         },
     }
@@ -63,6 +68,41 @@ DATABASES = {
     }
 }
 
+# Реплики только для чтения, например
+# DATABASE_REPLICAS=/srv/replica1.sqlite3,/srv/replica2.sqlite3.
+# В тестах они зеркалируют основную базу (TEST MIRROR), поэтому
+# набор тестов можно прогнать и с двумя локальными файлами SQLite.
+REPLICA_DATABASES = []
+
+for number, name in enumerate(
+        filter(None, os.getenv('DATABASE_REPLICAS', '').split(',')), 1):
+    alias = f'replica{number}'
+    DATABASES[alias] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': name,
+        'TEST': {'MIRROR': 'default'},
+    }
+    REPLICA_DATABASES.append(alias)
+
+DATABASE_ROUTERS = ['core.db_routers.PrimaryReplicaRouter']
+
+# Сколько секунд после записи клиент читает с основной базы. Это же
+# время считается верхней границей отставания реплик: прочитанное
+# с реплики в этом окне не кладётся в версионированные кеши.
+REPLICA_PIN_SECONDS = 5
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Команды bench_* очищают кеш между прогонами, поэтому подменяют
+    # им кеш по умолчанию только на время замера.
+    'bench': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'bench',
+    },
+}
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -96,12 +136,51 @@ STATICFILES_DIRS = (
     os.path.join(BASE_DIR, 'static'),
 )
 
+# Сессия читается из кеша, а в базу идёт только при промахе.
+# SESSION_ENGINE=django.contrib.sessions.backends.signed_cookies
+# убирает и эти запросы, но хранит сессию в cookie у клиента.
+SESSION_ENGINE = os.getenv(
+    'SESSION_ENGINE', 'django.contrib.sessions.backends.cached_db')
+
+# Сколько секунд CachedAuthenticationMiddleware держит пользователя
+# в кеше. Сохранение пользователя сбрасывает кеш сразу.
+USER_CACHE_TIMEOUT = 60
+
 LOGIN_URL = 'users:login'
 
 LOGIN_REDIRECT_URL = 'posts:index'
 
 # LOGOUT_REDIRECT_URL = 'posts:index'
 
+# Запросы дольше этого порога пишутся в лог yatube.requests
+# с уровнем WARNING, остальные — INFO.
+SLOW_REQUEST_MS = 500
+
+# Ответы короче порога не сжимаются: заголовки gzip и время на сжатие
+# съедают выигрыш. Уровни подобраны командой bench_compression.
+COMPRESSION_MIN_SIZE = 500
+
+COMPRESSION_GZIP_LEVEL = 6
+
+COMPRESSION_BROTLI_LEVEL = 4
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'yatube.requests': {
+            'handlers': ['console'],
+            'level': os.getenv('REQUEST_LOG_LEVEL', 'WARNING'),
+            'propagate': False,
+        },
+    },
+}
+
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
@@ -0,0 +1,89 @@
+"""Настройки для боевого запуска.
+
+DJANGO_SETTINGS_MODULE=yatube.settings_production
+"""
+from django.core.exceptions import ImproperlyConfigured
+
+from .settings import *  # noqa: F401,F403
+from .settings import CACHES, DATABASES, MIDDLEWARE, SECRET_KEY, TEMPLATES
+
+DEBUG = False
+
+SECRET_KEY = os.getenv('SECRET_KEY', SECRET_KEY)  # noqa: F405
+
+ALLOWED_HOSTS = os.getenv(  # noqa: F405
+    'ALLOWED_HOSTS', 'localhost,127.0.0.1').split(',')
+
+# WAL, PRAGMA и BEGIN IMMEDIATE — см. core/db_backends/sqlite3/base.py.
+# Соединение живёт между запросами потока, а не открывается заново.
+DATABASES = {
+    **DATABASES,
+    'default': {
+        **DATABASES['default'],
+        'ENGINE': 'core.db_backends.sqlite3',
+        'CONN_MAX_AGE': 600,
+    },
+}
+
+# Карточки, версии лент, RSS, счётчики и кеш пользователей сбрасываются
+# сигналами в процессе, который сделал запись. Кеш должен быть общим
+# для всех воркеров: memcached (python-memcached или pylibmc) или
+# Redis (django-redis); кеш в памяти процесса здесь запрещён.
+PER_PROCESS_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+CACHES = {
+    **CACHES,
+    'default': {
+        'BACKEND': os.getenv(  # noqa: F405
+            'CACHE_BACKEND',
+            'django.core.cache.backends.memcached.MemcachedCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION'),  # noqa: F405
+    },
+}
+
+if (CACHES['default']['BACKEND'] in PER_PROCESS_CACHES
+        or not CACHES['default']['LOCATION']):
+    raise ImproperlyConfigured(
+        'Нужен общий для всех процессов кеш: задайте CACHE_LOCATION '
+        '(и CACHE_BACKEND, если это не memcached).')
+
+# Шаблоны компилируются один раз на процесс: cached.Loader держит
+# скомпилированные шаблоны, включая подключаемые через {% include %}
+# карточки и пагинатор, и не читает файлы при каждом рендере.
+TEMPLATES = [{
+    **TEMPLATES[0],
+    'APP_DIRS': False,
+    'OPTIONS': {
+        **TEMPLATES[0]['OPTIONS'],
+        'debug': False,
+        'context_processors': [
+            processor
+            for processor in TEMPLATES[0]['OPTIONS']['context_processors']
+            if processor != 'django.template.context_processors.debug'
+        ],
+        'loaders': [
+            ('django.template.loaders.cached.Loader', [
+                'django.template.loaders.filesystem.Loader',
+                'django.template.loaders.app_directories.Loader',
+            ]),
+        ],
+    },
+}]
+
+# collectstatic складывает файлы с хешем содержимого в имени и их
+# .gz/.br копии, StaticFilesMiddleware отдаёт их с immutable-кешем.
+STATIC_ROOT = os.getenv(  # noqa: F405
+    'STATIC_ROOT', os.path.join(BASE_DIR, 'staticfiles'))  # noqa: F405
+
+STATICFILES_STORAGE = 'core.storage.CompressedManifestStaticFilesStorage'
+
+MIDDLEWARE = [
+    *MIDDLEWARE[:MIDDLEWARE.index(
+        'django.middleware.security.SecurityMiddleware') + 1],
+    'core.middleware.StaticFilesMiddleware',
+    *MIDDLEWARE[MIDDLEWARE.index(
+        'django.middleware.security.SecurityMiddleware') + 1:],
+]